@@ -6,11 +6,13 @@ from .config import config
 from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
 import werkzeug.exceptions
+from werkzeug.middleware.proxy_fix import ProxyFix
 # Models
 from .models import User, Video, Comment, Tag, Short
 
 # Extensions
 from .extensions import db, mailer
+from .storage import Storage
 
 # Routes
 from .routes import auth_route
@@ -19,6 +21,15 @@ from .routes import video_route
 from .routes import tags_route
 from .routes import comment_route
 from .routes import reaction_route
+from .routes import media_route
+
+# Background jobs & CLI
+from .services import VideoService
+from .lib.views import view_flusher
+from .commands import views_cli, trending_cli, uploads_cli, storage_cli
+from .lib.uploads import SpoolingRequest
+from .lib.upload_sessions import CHUNK_MIMETYPE
+from .lib.rate_limit import check_limits
 load_dotenv()
 
 migrate = Migrate()
@@ -27,9 +38,13 @@ jwt_manager = JWTManager()
 def create_app(config_mode=None):
     """Return Flask instance"""
     app = Flask(__name__)
+    app.request_class = SpoolingRequest
 
     @app.before_request
     def decode_req():
+        # Resumable upload chunks are binary and streamed from the request
+        if request.mimetype == CHUNK_MIMETYPE:
+            return
         if request.data:
             request.data = request.data.decode('utf-8')
     # Use default config_mode if not provided
@@ -43,12 +58,27 @@ def create_app(config_mode=None):
         }
         return jsonify(response), 404
 
+    @app.errorhandler(werkzeug.exceptions.RequestEntityTooLarge)
+    def handle_413_error(e):
+        response = {
+            "error": "Payload Too Large",
+            "message": f"Request body exceeds {app.config['MAX_CONTENT_LENGTH']} bytes.",
+            "status": 413
+        }
+        return jsonify(response), 413
+
 
     if config_mode is None:
         config_mode = os.getenv('CONFIG_MODE', 'development')
     
     print(f"Loading configuration for: {config_mode}")
     app.config.from_object(config[config_mode])
+    check_limits(app.config["RATE_LIMITS"])
+
+    # Client address and scheme from the trusted proxies' X-Forwarded headers
+    if app.config["TRUSTED_PROXIES"]:
+        proxies = app.config["TRUSTED_PROXIES"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
     
     # Database
     db.init_app(app)
@@ -62,6 +92,16 @@ def create_app(config_mode=None):
     # Initializing JWT
     jwt_manager.init_app(app)
 
+    # Media storage backend
+    Storage.init_app(app)
+
+    # Write-behind view counter
+    view_flusher.init_app(app, flush=VideoService.flush_views)
+    app.cli.add_command(views_cli)
+    app.cli.add_command(trending_cli)
+    app.cli.add_command(uploads_cli)
+    app.cli.add_command(storage_cli)
+
 
     # Enabling CORS
     CORS(app, supports_credentials=True)
@@ -72,6 +112,7 @@ def create_app(config_mode=None):
     app.register_blueprint(blueprint=tags_route, url_prefix='/tags')
     app.register_blueprint(blueprint=comment_route, url_prefix='/comments')
     app.register_blueprint(blueprint=reaction_route, url_prefix='/reaction')
+    app.register_blueprint(blueprint=media_route, url_prefix='/media')
 
 
     return app
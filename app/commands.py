@@ -0,0 +1,107 @@
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from .extensions import db
+from .services import VideoService
+from .lib.upload_jobs import UploadJobs, JOB_TTL
+from .lib.upload_sessions import UploadSessions
+from .lib.storage_outbox import StorageOutbox
+
+views_cli = AppGroup("views", help="Buffered video view counters.")
+trending_cli = AppGroup("trending", help="Trending videos index.")
+uploads_cli = AppGroup("uploads", help="Background video upload jobs.")
+storage_cli = AppGroup("storage", help="Deferred deletions of stored media.")
+
+# Seconds between sweeps of expired resumable upload files by the worker
+SWEEP_INTERVAL = 10 * 60
+# Seconds between checks for jobs whose worker stopped
+REAP_INTERVAL = 60
+
+
+@views_cli.command("flush")
+def flush_views():
+    """Write pending view deltas from Redis to Postgres."""
+    flushed = VideoService.flush_views()
+    click.echo(f"Flushed views of {flushed} videos")
+
+
+@trending_cli.command("rebuild")
+def rebuild_trending():
+    """Regenerate the trending sorted set from Postgres."""
+    total = VideoService.rebuild_trending()
+    click.echo(f"Trending index rebuilt with {total} videos")
+
+
+@uploads_cli.command("worker")
+@click.option("--timeout", default=5, help="Seconds to block waiting for a job.")
+def upload_worker(timeout):
+    """Transfer queued uploads to storage until interrupted."""
+    click.echo("Upload worker started")
+    last_sweep = last_reap = 0
+    while True:
+        if time.monotonic() - last_sweep >= SWEEP_INTERVAL:
+            last_sweep = time.monotonic()
+            UploadSessions.sweep(current_app.config["UPLOAD_STAGING_DIR"])
+            VideoService.fail_stale_uploads(JOB_TTL)
+        if time.monotonic() - last_reap >= REAP_INTERVAL:
+            last_reap = time.monotonic()
+            reap_jobs()
+        job_id = UploadJobs.pop(timeout)
+        if job_id is None:
+            continue
+        try:
+            done = VideoService.process_upload(job_id)
+        finally:
+            UploadJobs.ack(job_id)
+        click.echo(f"Upload job {job_id} {'done' if done else 'failed'}")
+        # Start every job with a fresh session
+        db.session.remove()
+
+
+def reap_jobs():
+    """Requeue jobs of stopped workers, failing those out of attempts."""
+    abandoned = UploadJobs.requeue_stale(
+        current_app.config["UPLOAD_JOB_TIMEOUT"], current_app.config["UPLOAD_JOB_MAX_ATTEMPTS"]
+    )
+    VideoService.fail_uploads(abandoned)
+
+
+@uploads_cli.command("sweep")
+def sweep_sessions():
+    """Delete staging files of expired resumable uploads and fail lost jobs."""
+    removed = UploadSessions.sweep(current_app.config["UPLOAD_STAGING_DIR"])
+    click.echo(f"Removed {removed} expired upload files")
+    reap_jobs()
+    failed = VideoService.fail_stale_uploads(JOB_TTL)
+    click.echo(f"Marked {failed} stalled uploads failed")
+
+
+@storage_cli.command("worker")
+@click.option("--interval", default=5, help="Seconds to wait when no deletion is due.")
+def storage_worker(interval):
+    """Delete files queued in the storage outbox until interrupted."""
+    click.echo("Storage worker started")
+    while True:
+        try:
+            handled = StorageOutbox.drain()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error draining storage outbox: {e}")
+            handled = 0
+        # Keep going while full batches are due
+        if handled < current_app.config["STORAGE_OUTBOX_BATCH_SIZE"]:
+            time.sleep(interval)
+        db.session.remove()
+
+
+@storage_cli.command("drain")
+def drain_outbox():
+    """Delete every file due in the storage outbox once, then exit."""
+    total = 0
+    while True:
+        handled = StorageOutbox.drain()
+        total += handled
+        if handled < current_app.config["STORAGE_OUTBOX_BATCH_SIZE"]:
+            break
+    click.echo(f"Handled {total} queued deletions")
@@ -2,6 +2,7 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 import datetime
+import tempfile
 
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = True
@@ -26,6 +27,61 @@ class Config:
     MAIL_SUPPRESS_SEND = os.getenv('MAIL_SUPPRESS_SEND', 'False') == 'True'
     MAIL_DEBUG = os.getenv('MAIL_DEBUG', 'False') == 'True'
 
+    # Seconds between flushes of buffered video views (0 disables the thread)
+    VIEW_FLUSH_INTERVAL = int(os.getenv('VIEW_FLUSH_INTERVAL', 10))
+
+    # Seconds shared caches (CDN) may serve read endpoints before revalidating
+    HTTP_CACHE_S_MAXAGE = int(os.getenv('HTTP_CACHE_S_MAXAGE', 60))
+
+    # Uploads: bodies over MAX_CONTENT_LENGTH are rejected before parsing, files
+    # over UPLOAD_SPOOL_THRESHOLD are spooled to UPLOAD_TMP_DIR, and storage
+    # transfers read UPLOAD_BUFFER_SIZE bytes at a time
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 2 * 1024 ** 3))
+    UPLOAD_SPOOL_THRESHOLD = int(os.getenv('UPLOAD_SPOOL_THRESHOLD', 1024 ** 2))
+    UPLOAD_BUFFER_SIZE = int(os.getenv('UPLOAD_BUFFER_SIZE', 64 * 1024))
+    UPLOAD_TMP_DIR = os.getenv('UPLOAD_TMP_DIR') or None
+    MAX_IMAGE_SIZE = int(os.getenv('MAX_IMAGE_SIZE', 10 * 1024 ** 2))
+    # Processes resizing images into WebP variants, per app process
+    IMAGE_PROCESS_WORKERS = int(os.getenv('IMAGE_PROCESS_WORKERS', 2))
+    # Storage transfers a worker process runs at once (video and thumbnail go in parallel)
+    UPLOAD_TRANSFER_THREADS = int(os.getenv('UPLOAD_TRANSFER_THREADS', 4))
+    # Files wait here for the upload worker; must be shared with `flask uploads worker`
+    UPLOAD_STAGING_DIR = os.getenv('UPLOAD_STAGING_DIR', os.path.join(tempfile.gettempdir(), 'odysee-staging'))
+    # A claimed upload job without progress for UPLOAD_JOB_TIMEOUT seconds is
+    # requeued, up to UPLOAD_JOB_MAX_ATTEMPTS claims in total
+    UPLOAD_JOB_TIMEOUT = int(os.getenv('UPLOAD_JOB_TIMEOUT', 15 * 60))
+    UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv('UPLOAD_JOB_MAX_ATTEMPTS', 3))
+
+    # Media storage: "imagekit", or "local" to keep files under LOCAL_STORAGE_ROOT
+    # and serve them from LOCAL_STORAGE_URL through the media route
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'imagekit')
+    # ImageKit credentials have no defaults; create_app fails without them
+    IMAGEKIT_PRIVATE_KEY = os.getenv('IMAGEKIT_PRIVATE_KEY')
+    IMAGEKIT_PUBLIC_KEY = os.getenv('IMAGEKIT_PUBLIC_KEY')
+    IMAGEKIT_URL_ENDPOINT = os.getenv('IMAGEKIT_URL_ENDPOINT')
+    LOCAL_STORAGE_ROOT = os.path.abspath(os.getenv('LOCAL_STORAGE_ROOT', 'media'))
+    LOCAL_STORAGE_URL = os.getenv('LOCAL_STORAGE_URL', '/media')
+    # Let the front server send media files and their ranges (video seeks)
+    # with sendfile: an nginx internal location mapped to LOCAL_STORAGE_ROOT
+    # (X-Accel-Redirect), or X-Sendfile for Apache mod_xsendfile / lighttpd.
+    # Without either, range requests are copied through Python.
+    MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT')
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'False') == 'True'
+    # Deferred deletions drained by `flask storage worker`: files per bulk call,
+    # retry delays in seconds (doubling from STORAGE_OUTBOX_BACKOFF) and tries before giving up
+    STORAGE_OUTBOX_BATCH_SIZE = int(os.getenv('STORAGE_OUTBOX_BATCH_SIZE', 100))
+    STORAGE_OUTBOX_BACKOFF = int(os.getenv('STORAGE_OUTBOX_BACKOFF', 30))
+    STORAGE_OUTBOX_MAX_BACKOFF = int(os.getenv('STORAGE_OUTBOX_MAX_BACKOFF', 3600))
+    STORAGE_OUTBOX_MAX_ATTEMPTS = int(os.getenv('STORAGE_OUTBOX_MAX_ATTEMPTS', 10))
+
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto to trust;
+    # 0 keys rate limits on the socket address, which behind a proxy is the proxy's
+    TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 0))
+    # Per-route rate limit overrides, e.g. "auth-login=10/minute,video-upload=20/hour"
+    RATE_LIMITS = dict(
+        item.strip().split('=', 1) for item in os.getenv('RATE_LIMITS', '').split(',') if '=' in item
+    )
+
 class DevelopmentConfig(Config):
     DEVELOPMENT = True
     DEBUG = True
@@ -1 +1,4 @@
-from .file_types import (VIDEO_FILE_TYPES, IMAGE_FILE_TYPES)
\ No newline at end of file
+from .file_types import (VIDEO_FILE_TYPES, IMAGE_FILE_TYPES, VIDEO_CONTAINERS)
+from .pagination import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, DEFAULT_REPLIES_PER_THREAD,
+                         MAX_REPLIES_PER_THREAD)
+from .images import THUMBNAIL_WIDTHS, PROFILE_IMAGE_WIDTHS, WEBP_QUALITY
@@ -1,2 +1,11 @@
 VIDEO_FILE_TYPES = [".mp4", ".mov", '.mkv', '.webm', '.m4v']
-IMAGE_FILE_TYPES = [".png", ".jpeg", ".jpg", ".webp"]
\ No newline at end of file
+IMAGE_FILE_TYPES = [".png", ".jpeg", ".jpg", ".webp"]
+
+# Containers the header probe must find behind each video extension
+VIDEO_CONTAINERS = {
+    ".mp4": ("mp4",),
+    ".mov": ("mp4",),
+    ".m4v": ("mp4",),
+    ".webm": ("webm", "matroska"),
+    ".mkv": ("webm", "matroska"),
+}
\ No newline at end of file
@@ -0,0 +1,4 @@
+# Widths of the WebP variants generated at upload time
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+PROFILE_IMAGE_WIDTHS = (48, 96, 192)
+WEBP_QUALITY = 80
@@ -0,0 +1,4 @@
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+DEFAULT_REPLIES_PER_THREAD = 3
+MAX_REPLIES_PER_THREAD = 10
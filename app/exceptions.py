@@ -1,2 +1,5 @@
 class NotFoundError(Exception):
+    pass
+
+class ConflictError(Exception):
     pass
\ No newline at end of file
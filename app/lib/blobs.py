@@ -0,0 +1,128 @@
+from collections import Counter
+from io import BytesIO
+from flask import current_app
+from sqlalchemy import column, delete, update, values, Integer, String
+from sqlalchemy.dialects.postgresql import insert
+from ..extensions import db
+from ..models import MediaBlob
+from ..storage import Storage
+from ..types import UploadResult
+from ..utils import file_sha256
+from .storage_outbox import StorageOutbox
+
+
+class MediaBlobs:
+    """
+    Content-addressed storage: uploads with the same SHA-256 share one stored
+    file, counted in media_blob. Files stored before deduplication are not
+    tracked and belong to their single owner.
+    """
+
+    @staticmethod
+    def store(file, file_name: str, folder: str, content_type: str = "application/octet-stream",
+              on_progress=None, upload=None, digest: str = None) -> UploadResult:
+        """
+        Store an open binary file unless the same content is already stored,
+        and take a reference to it. Without a known digest the file is hashed
+        in bounded chunks first; upload defaults to Storage.upload_stream. Commits.
+        """
+        digest = digest or file_sha256(file, current_app.config["UPLOAD_BUFFER_SIZE"])
+        stored = MediaBlobs.acquire(digest)
+        if stored is not None:
+            if on_progress:
+                size = MediaBlobs._size(file)
+                on_progress(size, size)
+            return stored
+
+        upload = upload or Storage.upload_stream
+        return MediaBlobs.register(digest, upload(file, file_name, folder, content_type, on_progress=on_progress))
+
+    @staticmethod
+    def store_bytes(data: bytes, file_name: str, folder: str,
+                    content_type: str = "application/octet-stream") -> UploadResult:
+        """store() for an in-memory file."""
+        return MediaBlobs.store(BytesIO(data), file_name, folder, content_type)
+
+    @staticmethod
+    def acquire(digest: str):
+        """Take a reference to the stored file with this hash; None when there is none. Commits."""
+        row = db.session.execute(
+            update(MediaBlob)
+            .where(MediaBlob.hash == digest)
+            .values(refcount=MediaBlob.refcount + 1)
+            .returning(MediaBlob.file_id, MediaBlob.url)
+        ).first()
+        db.session.commit()
+        if row is None:
+            return None
+        return UploadResult(file_id=row.file_id, url=row.url, raw={})
+
+    @staticmethod
+    def register(digest: str, stored: UploadResult) -> UploadResult:
+        """
+        Record a freshly stored file as the blob of digest. When a concurrent
+        upload of the same content registered first, its file is referenced
+        instead and this copy is queued for deletion. Commits.
+        """
+        statement = insert(MediaBlob).values(hash=digest, file_id=stored.file_id, url=stored.url, refcount=1)
+        row = db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[MediaBlob.hash],
+                set_={"refcount": MediaBlob.refcount + 1},
+            ).returning(MediaBlob.file_id, MediaBlob.url)
+        ).one()
+        if row.file_id == stored.file_id:
+            db.session.commit()
+            return stored
+
+        StorageOutbox.enqueue([stored.file_id])
+        db.session.commit()
+        return UploadResult(file_id=row.file_id, url=row.url, raw={})
+
+    @staticmethod
+    def release(file_ids: list) -> list:
+        """
+        Drop one reference per listed file ID and queue the files no longer
+        referenced for deletion, without committing, so both share the
+        caller's transaction. Returns the queued IDs.
+        """
+        counts = Counter(file_ids)
+        if not counts:
+            return []
+        pending = values(
+            column("file_id", String),
+            column("n", Integer),
+            name="pending",
+        ).data(list(counts.items()))
+        rows = db.session.execute(
+            update(MediaBlob)
+            .where(MediaBlob.file_id == pending.c.file_id)
+            .values(refcount=MediaBlob.refcount - pending.c.n)
+            .returning(MediaBlob.file_id, MediaBlob.refcount)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        unreferenced = [row.file_id for row in rows if row.refcount <= 0]
+        if unreferenced:
+            db.session.execute(
+                delete(MediaBlob)
+                .where(MediaBlob.file_id.in_(unreferenced), MediaBlob.refcount <= 0)
+                .execution_options(synchronize_session=False)
+            )
+        tracked = {row.file_id for row in rows}
+        unreferenced += [file_id for file_id in counts if file_id not in tracked]
+        StorageOutbox.enqueue(unreferenced)
+        return unreferenced
+
+    @staticmethod
+    def discard(file_ids: list):
+        """release() in a transaction of its own, e.g. to undo stores after a failure."""
+        MediaBlobs.release(file_ids)
+        db.session.commit()
+
+    @staticmethod
+    def _size(file) -> int:
+        position = file.tell()
+        size = file.seek(0, 2) - position
+        file.seek(position)
+        return size
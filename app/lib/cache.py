@@ -0,0 +1,80 @@
+import json
+import redis
+from ..extensions import CacheStorage
+
+
+class ResponseCache:
+    """
+    Versioned cache of serialized responses kept in CacheStorage.
+    Writers call invalidate() to bump the version, which makes every
+    previously cached page unreachable; stale pages then age out by TTL.
+    """
+
+    def __init__(self, namespace: str, ttl: int = 60):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, version: int, parts: tuple) -> str:
+        suffix = ":".join(str(part) if part is not None else "" for part in parts)
+        return f"{self.namespace}:v{version}:{suffix}"
+
+    def version(self) -> int:
+        value = CacheStorage.get(f"{self.namespace}:version")
+        return int(value) if value else 0
+
+    def get(self, *parts):
+        """
+        Return (version, payload) for parts; payload is None on a miss. Pass
+        the version on to set() so a page read before a write is never
+        stored under the version that write created. The version is None
+        when Redis is unavailable.
+        """
+        try:
+            version = self.version()
+            value = CacheStorage.get(self._key(version, parts))
+            CacheStorage.hincrby(f"{self.namespace}:stats", "hits" if value else "misses", 1)
+        except redis.RedisError as e:
+            print(f"Cache read failed: {e}")
+            return None, None
+        return version, json.loads(value) if value else None
+
+    def set(self, version, payload, *parts):
+        """Store payload under parts for the version get() returned."""
+        if version is None:
+            return
+        try:
+            CacheStorage.set(
+                self._key(version, parts),
+                json.dumps(payload, default=str),
+                ex=self.ttl,
+            )
+        except redis.RedisError as e:
+            print(f"Cache write failed: {e}")
+
+    def invalidate(self):
+        """
+        Bump the version so readers never see pages cached before a write.
+        Runs after the write is committed, so a Redis error is only logged:
+        the stale pages expire within the TTL. Returns the new version, or
+        None when Redis was unavailable.
+        """
+        try:
+            return CacheStorage.incr(f"{self.namespace}:version")
+        except redis.RedisError as e:
+            print(f"Cache invalidation failed: {e}")
+            return None
+
+    def stats(self) -> dict:
+        counters = CacheStorage.hgetall(f"{self.namespace}:stats")
+        hits = int(counters.get(b"hits", 0))
+        misses = int(counters.get(b"misses", 0))
+        total = hits + misses
+        return {
+            "version": self.version(),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+
+
+VideoListCache = ResponseCache("cache:video:list", ttl=60)
@@ -0,0 +1,170 @@
+import json
+import uuid
+import redis
+from ..extensions import CacheStorage
+from ..constants import MAX_PAGE_SIZE
+from ..utils import encode_cursor
+
+# Newest comments kept per video; any first page fits in the window
+WINDOW_SIZE = MAX_PAGE_SIZE
+WINDOW_TTL = 10 * 60
+# Last element of a window that holds every comment of the video
+COMPLETE = b"~"
+
+# Every write to a window stores a fresh token under the window's
+# generation key; a fill only lands if the token is still the one read
+# before its database query, so an older snapshot never replaces newer data.
+_fill = CacheStorage.register_script("""
+local current = redis.call('GET', KEYS[2]) or ''
+if current ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('RPUSH', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+""")
+
+# Prepend a comment to a warm window unless a fill already brought it in
+_push = CacheStorage.register_script("""
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for _, item in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    if item ~= ARGV[5] then
+        local ok, decoded = pcall(cjson.decode, item)
+        if ok and decoded['id'] == ARGV[2] then
+            return 0
+        end
+    end
+end
+redis.call('LPUSH', KEYS[1], ARGV[1])
+redis.call('LTRIM', KEYS[1], 0, tonumber(ARGV[6]) - 1)
+return 1
+""")
+
+_remove = CacheStorage.register_script("""
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+local items = redis.call('LRANGE', KEYS[1], 0, -1)
+for _, item in ipairs(items) do
+    if item ~= ARGV[2] then
+        local ok, decoded = pcall(cjson.decode, item)
+        if ok and decoded['id'] == ARGV[1] then
+            return redis.call('LREM', KEYS[1], 1, item)
+        end
+    end
+end
+return 0
+""")
+
+
+def _key(video_id) -> str:
+    return f"comments:latest:{video_id}"
+
+
+def _generation_key(video_id) -> str:
+    return f"comments:latest:{video_id}:gen"
+
+
+def _token() -> str:
+    return uuid.uuid4().hex
+
+
+def _cursor(comment: dict) -> str:
+    return encode_cursor(comment["created_at"], comment["id"])
+
+
+class CommentWindow:
+    """
+    Capped CacheStorage list of the latest serialized comments of a video,
+    newest first. Windows are filled lazily on the first read and expire
+    after WINDOW_TTL, which bounds memory to the videos being watched.
+    Readers take generation() before querying the database and hand it to
+    fill(), which is skipped if a write came in between.
+    """
+
+    @staticmethod
+    def generation(video_id):
+        """Token of the last write to the window ('' if none), or None when Redis is unavailable."""
+        try:
+            value = CacheStorage.get(_generation_key(video_id))
+        except redis.RedisError as e:
+            print(f"Comment window read failed: {e}")
+            return None
+        return value.decode("utf-8") if value else ""
+
+    @staticmethod
+    def first_page(video_id, limit: int):
+        """(comments, next_cursor) for the first page, or None when the window can't serve it."""
+        try:
+            items = CacheStorage.lrange(_key(video_id), 0, limit)
+        except redis.RedisError as e:
+            print(f"Comment window read failed: {e}")
+            return None
+        if not items:
+            return None
+
+        complete = items[-1] == COMPLETE
+        comments = [json.loads(item) for item in items if item != COMPLETE]
+        if len(comments) > limit:
+            comments = comments[:limit]
+            return comments, _cursor(comments[-1])
+        if complete:
+            return comments, None
+        if len(comments) == limit:
+            return comments, _cursor(comments[-1])
+        # Shrunk below a page by deletions; refill from the database
+        return None
+
+    @staticmethod
+    def fill(video_id, comments: list, complete: bool, generation):
+        """
+        Replace the window with the newest comments read from the database,
+        unless the window was written since generation() returned generation.
+        """
+        if generation is None:
+            return
+        items = [json.dumps(comment, default=str) for comment in comments[:WINDOW_SIZE]]
+        if complete:
+            items.append(COMPLETE)
+        if not items:
+            return
+        try:
+            _fill(keys=[_key(video_id), _generation_key(video_id)], args=[generation, WINDOW_TTL, *items])
+        except redis.RedisError as e:
+            print(f"Comment window write failed: {e}")
+
+    @staticmethod
+    def push(video_id, comment: dict):
+        """Prepend a new comment to a warm window and keep it capped."""
+        try:
+            _push(
+                keys=[_key(video_id), _generation_key(video_id)],
+                args=[json.dumps(comment, default=str), str(comment["id"]), _token(), WINDOW_TTL,
+                      COMPLETE, WINDOW_SIZE],
+            )
+        except redis.RedisError as e:
+            print(f"Comment window write failed: {e}")
+            CommentWindow.drop(video_id)
+
+    @staticmethod
+    def remove(video_id, comment_id):
+        try:
+            _remove(
+                keys=[_key(video_id), _generation_key(video_id)],
+                args=[str(comment_id), COMPLETE, _token(), WINDOW_TTL],
+            )
+        except redis.RedisError as e:
+            print(f"Comment window write failed: {e}")
+            CommentWindow.drop(video_id)
+
+    @staticmethod
+    def drop(video_id):
+        try:
+            pipe = CacheStorage.pipeline()
+            pipe.set(_generation_key(video_id), _token(), ex=WINDOW_TTL)
+            pipe.delete(_key(video_id))
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"Comment window drop failed: {e}")
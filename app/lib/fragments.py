@@ -0,0 +1,50 @@
+import json
+import redis
+from ..extensions import CacheStorage
+
+FRAGMENT_TTL = 24 * 60 * 60
+
+
+class VideoFragments:
+    """Pre-serialized per-video JSON kept in CacheStorage under video:{id}."""
+
+    @staticmethod
+    def key(video_id) -> str:
+        return f"video:{video_id}"
+
+    @staticmethod
+    def get_many(video_ids: list) -> dict:
+        """Fetch fragments with a single MGET; missing IDs are left out."""
+        if not video_ids:
+            return {}
+        values = CacheStorage.mget([VideoFragments.key(id) for id in video_ids])
+        return {
+            str(id): json.loads(value)
+            for id, value in zip(video_ids, values)
+            if value is not None
+        }
+
+    @staticmethod
+    def set_many(fragments: dict):
+        """
+        Write {video_id: fragment} in one pipeline. Called after commits, so
+        a Redis error is logged and the old fragments live out FRAGMENT_TTL.
+        """
+        if not fragments:
+            return
+        pipe = CacheStorage.pipeline(transaction=False)
+        for id, fragment in fragments.items():
+            pipe.set(VideoFragments.key(id), json.dumps(fragment, default=str), ex=FRAGMENT_TTL)
+        try:
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"Error writing video fragments: {e}")
+
+    @staticmethod
+    def delete(*video_ids):
+        if not video_ids:
+            return
+        try:
+            CacheStorage.delete(*[VideoFragments.key(id) for id in video_ids])
+        except redis.RedisError as e:
+            print(f"Error deleting video fragments: {e}")
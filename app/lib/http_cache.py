@@ -0,0 +1,134 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+import redis
+from flask import request, make_response, current_app
+from ..extensions import CacheStorage
+
+VERSION_TTL = 7 * 24 * 60 * 60
+
+_purge_handlers = []
+
+
+def _version_key(surrogate_key: str) -> str:
+    return f"surrogate:{surrogate_key}"
+
+
+def register_purge_handler(handler):
+    """Call handler(keys) on every purge, e.g. to forward keys to a CDN purge API."""
+    _purge_handlers.append(handler)
+    return handler
+
+
+def purge_surrogate_keys(*keys):
+    """
+    Mark the entities behind keys (e.g. video-<id>, tag-list) as changed.
+    Their ETag and Last-Modified move forward and purge handlers are notified.
+    """
+    if not keys:
+        return
+    now = time.time()
+    try:
+        pipe = CacheStorage.pipeline(transaction=False)
+        for key in keys:
+            pipe.set(_version_key(key), now, ex=VERSION_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Error bumping surrogate keys: {e}")
+    for handler in _purge_handlers:
+        try:
+            handler(list(keys))
+        except Exception as e:
+            print(f"Error in purge handler: {e}")
+
+
+def _versions(keys: list) -> list:
+    """Last-change timestamps of keys; None for keys without one yet."""
+    values = CacheStorage.mget([_version_key(key) for key in keys])
+    return [float(value) if value is not None else None for value in values]
+
+
+def _seed(keys: list, versions: list, now: float):
+    """
+    Give the keys missing from versions a first timestamp of now, taken
+    before the view ran. Returns the complete versions, or None when a purge
+    got in first, since the response may then predate it.
+    """
+    missing = [key for key, version in zip(keys, versions) if version is None]
+    pipe = CacheStorage.pipeline(transaction=False)
+    for key in missing:
+        pipe.set(_version_key(key), now, ex=VERSION_TTL, nx=True)
+    if not all(pipe.execute()):
+        return None
+    return [now if version is None else version for version in versions]
+
+
+def _validators(versions: list) -> tuple:
+    """(ETag digest, Last-Modified) of the current request for versions."""
+    digest = hashlib.sha1(
+        "|".join([request.full_path] + [repr(version) for version in versions]).encode('utf-8')
+    ).hexdigest()
+    return digest, datetime.fromtimestamp(int(max(versions)), tz=timezone.utc)
+
+
+def conditional(surrogate_keys, not_modified=None):
+    """
+    Serve a GET endpoint with a weak ETag, Last-Modified, Cache-Control and
+    Surrogate-Key headers. Validators come from the surrogate key versions
+    alone, so a matching If-None-Match/If-Modified-Since is answered with 304
+    before the view runs. Keys are only created by purges and by successful
+    responses, so requests for missing entities leave nothing behind.
+
+    surrogate_keys receives the view arguments and returns the keys the
+    response depends on; not_modified, if given, is called with them on a 304.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = surrogate_keys(**kwargs)
+            now = time.time()
+            try:
+                versions = _versions(keys)
+            except redis.RedisError as e:
+                print(f"Error reading surrogate keys: {e}")
+                return view(*args, **kwargs)
+
+            # A key without a version has never been served, so nothing can be fresh
+            fresh = False
+            if None not in versions:
+                digest, last_modified = _validators(versions)
+                if request.if_none_match:
+                    fresh = request.if_none_match.contains_weak(digest)
+                else:
+                    fresh = bool(request.if_modified_since) and request.if_modified_since >= last_modified
+
+            if fresh:
+                if not_modified is not None:
+                    not_modified(**kwargs)
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if None in versions:
+                    try:
+                        versions = _seed(keys, versions, now)
+                    except redis.RedisError as e:
+                        print(f"Error seeding surrogate keys: {e}")
+                        versions = None
+                    if versions is None:
+                        return response
+                digest, last_modified = _validators(versions)
+
+            # Weak: bodies may differ in volatile fields such as view counts
+            response.set_etag(digest, weak=True)
+            response.last_modified = last_modified
+            response.headers["Cache-Control"] = (
+                f"public, max-age=0, must-revalidate, "
+                f"s-maxage={current_app.config.get('HTTP_CACHE_S_MAXAGE', 60)}"
+            )
+            response.headers["Surrogate-Key"] = " ".join(keys)
+            return response
+        return wrapper
+    return decorator
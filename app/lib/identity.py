@@ -0,0 +1,20 @@
+from uuid import UUID
+from flask import request
+from flask_jwt_extended import decode_token
+
+
+def get_optional_user_id():
+    """
+    Return the user ID from the refresh token cookie, or None for anonymous
+    callers and invalid tokens. For public endpoints that personalize output.
+    """
+    jwt_token = request.cookies.get("refresh_token_cookie")
+    if not jwt_token:
+        return None
+    try:
+        decoded_token = decode_token(jwt_token)
+        return UUID(decoded_token["sub"])
+    except Exception as e:
+        print(f"Error decoding JWT token: {e}")
+        # If the JWT token is invalid, treat the user as unauthenticated
+        return None
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from ..constants import WEBP_QUALITY
+from ..utils.images import webp_variants
+from .blobs import MediaBlobs
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process-wide pool capping the images resized at once."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a process that runs threads can copy held locks
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver") if "forkserver" in methods else None
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        return _pool
+
+
+def read_image(stream, max_size: int) -> bytes:
+    """Read an uploaded image, rewound for the upload that follows, or raise ValueError when too large."""
+    data = stream.read(max_size + 1)
+    stream.seek(0)
+    if len(data) > max_size:
+        raise ValueError(f"Image exceeds {max_size} bytes")
+    return data
+
+
+def create_variants(data: bytes, folder: str, widths: tuple) -> dict:
+    """
+    Resize an image to WebP variants on the process pool and store them.
+    Returns the size map {"<width>": {"fileId", "url", "width", "height"}}
+    recorded in the image JSON. Variants identical to stored files reuse them;
+    the ones taken before a failure are released.
+    """
+    pool = _process_pool(current_app.config["IMAGE_PROCESS_WORKERS"])
+    variants = pool.submit(webp_variants, data, tuple(widths), WEBP_QUALITY).result()
+
+    name = os.urandom(12).hex()
+    sizes = {}
+    try:
+        for width, (content, height) in variants.items():
+            stored = MediaBlobs.store_bytes(content, f"{name}_{width}.webp", folder, "image/webp")
+            sizes[str(width)] = {"fileId": stored.file_id, "url": stored.url, "width": width, "height": height}
+    except Exception:
+        MediaBlobs.discard([variant["fileId"] for variant in sizes.values()])
+        raise
+    return sizes
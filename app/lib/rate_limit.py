@@ -0,0 +1,99 @@
+import time
+import uuid
+from functools import wraps
+import redis
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from ..extensions import CacheStorage
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Sliding-window log: drop hits older than the window, admit the request if
+# the remaining count is under the limit, and report what the headers need.
+# Returns {allowed, remaining, ms until the oldest hit leaves the window}.
+_hit = CacheStorage.register_script("""
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', KEYS[1], window)
+local reset = window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+return {allowed, limit - count, reset}
+""")
+
+
+def parse_limit(limit: str):
+    """'10/minute' -> (10, 60); ValueError for anything else."""
+    try:
+        count, period = limit.split("/", 1)
+        return int(count), PERIODS[period.strip().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit {limit!r}, expected e.g. '10/minute'")
+
+
+def check_limits(limits: dict):
+    """Parse the RATE_LIMITS overrides once at startup so a typo fails the boot, not each request."""
+    for scope, limit in limits.items():
+        try:
+            parse_limit(limit)
+        except ValueError as e:
+            raise ValueError(f"RATE_LIMITS[{scope}]: {e}")
+
+
+def _client_key(scope: str) -> str:
+    try:
+        # Set only when the view is already behind @jwt_required
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+    if identity:
+        return f"ratelimit:{scope}:user:{identity}"
+    # remote_addr is the client's only when ProxyFix trusts the front proxies (TRUSTED_PROXIES)
+    return f"ratelimit:{scope}:ip:{request.remote_addr}"
+
+
+def rate_limit(scope: str, default: str):
+    """
+    Limit a view to `default` (e.g. "10/minute") requests per caller, keyed
+    by JWT identity when the request is authenticated and by IP otherwise.
+    RATE_LIMITS[scope] in the app config overrides the default. Costs one
+    Redis round trip and fails open when Redis is unavailable.
+    Place below @jwt_required so the identity is known.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limit, period = parse_limit(current_app.config.get("RATE_LIMITS", {}).get(scope, default))
+            now = int(time.time() * 1000)
+            try:
+                allowed, remaining, reset_ms = _hit(
+                    keys=[_client_key(scope)],
+                    args=[now, period * 1000, limit, f"{now}:{uuid.uuid4().hex}"],
+                )
+            except redis.RedisError as e:
+                print(f"Rate limiter unavailable: {e}")
+                return view(*args, **kwargs)
+
+            reset = max(1, -(-int(reset_ms) // 1000))
+            if allowed:
+                response = make_response(view(*args, **kwargs))
+            else:
+                response = make_response(jsonify({"message": "Too many requests, try again later"}), 429)
+                response.headers["Retry-After"] = str(reset)
+            response.headers["RateLimit-Limit"] = str(limit)
+            response.headers["RateLimit-Remaining"] = str(max(0, int(remaining)))
+            response.headers["RateLimit-Reset"] = str(reset)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from ..extensions import db
+from ..models import StorageDeletion
+from ..storage import Storage
+
+
+class StorageOutbox:
+    """
+    Remote deletions recorded in storage_outbox by the transaction that
+    released the files, and carried out later by `flask storage worker`,
+    so requests never wait on storage and a rollback never loses a file.
+    """
+
+    @staticmethod
+    def enqueue(file_ids: list):
+        """Record file IDs for deletion without committing, so the caller's transaction decides."""
+        db.session.add_all([StorageDeletion(file_id=file_id) for file_id in dict.fromkeys(file_ids)])
+
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        """Delay before the next try of a deletion that failed attempts times."""
+        config = current_app.config
+        seconds = config["STORAGE_OUTBOX_BACKOFF"] * 2 ** (attempts - 1)
+        return timedelta(seconds=min(seconds, config["STORAGE_OUTBOX_MAX_BACKOFF"]))
+
+    @staticmethod
+    def drain() -> int:
+        """
+        Delete one batch of due files with a single bulk call. Rows are
+        claimed with FOR UPDATE SKIP LOCKED so workers can run side by side.
+        Failed deletions are retried with exponential backoff and dropped
+        after STORAGE_OUTBOX_MAX_ATTEMPTS. Returns the number of rows handled.
+        """
+        config = current_app.config
+        now = datetime.utcnow()
+        rows = db.session.execute(
+            select(StorageDeletion)
+            .where(StorageDeletion.next_attempt_at <= now)
+            .order_by(StorageDeletion.next_attempt_at, StorageDeletion.id)
+            .limit(config["STORAGE_OUTBOX_BATCH_SIZE"])
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not rows:
+            db.session.commit()
+            return 0
+
+        file_ids = list(dict.fromkeys(row.file_id for row in rows))
+        try:
+            failed = set(Storage.bulk_delete(file_ids))
+            # Files already gone (e.g. removed by hand) need no retry
+            failed = {file_id for file_id in failed if Storage.exists(file_id)}
+            error = "Storage did not delete the file"
+        except Exception as e:
+            failed, error = set(file_ids), str(e)
+
+        for row in rows:
+            if row.file_id not in failed:
+                db.session.delete(row)
+                continue
+            row.attempts += 1
+            if row.attempts >= config["STORAGE_OUTBOX_MAX_ATTEMPTS"]:
+                print(f"Giving up deleting file {row.file_id} after {row.attempts} attempts: {error}")
+                db.session.delete(row)
+                continue
+            row.last_error = error
+            row.next_attempt_at = now + StorageOutbox.backoff(row.attempts)
+        db.session.commit()
+        return len(rows)
@@ -0,0 +1,92 @@
+import time
+import redis
+from ..extensions import CacheStorage
+
+TRENDING_KEY = "trending:videos"
+EPOCH_KEY = "trending:epoch"
+# Every HALF_LIFE seconds an event is worth half as much as a fresh one
+HALF_LIFE = 24 * 60 * 60
+
+VIEW_WEIGHT = 1
+LIKE_WEIGHT = 5
+DISLIKE_WEIGHT = -2
+COMMENT_WEIGHT = 3
+
+# Instead of decaying every member, new events are scaled up by
+# 2 ** ((now - epoch) / HALF_LIFE), which preserves the ordering a decayed
+# score would give. Once the exponent reaches REBASE_AFTER the whole set is
+# scaled down by the factor in one ZUNIONSTORE and the epoch moves to now, so
+# the factor never overflows. Scores are clamped at 0: a removal (e.g. an
+# unlike) is subtracted at the current factor, which can exceed what the
+# original event added.
+REBASE_AFTER = 16
+
+_bump = CacheStorage.register_script("""
+local now = tonumber(ARGV[3])
+local half_life = tonumber(ARGV[4])
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    epoch = now
+    redis.call('SET', KEYS[2], epoch)
+end
+local exponent = (now - epoch) / half_life
+if exponent >= tonumber(ARGV[5]) then
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', 2 ^ -exponent)
+    end
+    redis.call('SET', KEYS[2], now)
+    exponent = 0
+end
+local score = tonumber(redis.call('ZINCRBY', KEYS[1], tonumber(ARGV[2]) * 2 ^ exponent, ARGV[1]))
+if score < 0 then
+    redis.call('ZADD', KEYS[1], 0, ARGV[1])
+    score = 0
+end
+return tostring(score)
+""")
+
+
+def decay_factor(at: float, epoch: float) -> float:
+    return 2 ** ((at - epoch) / HALF_LIFE)
+
+
+class Trending:
+    """Time-decayed popularity of videos kept in a CacheStorage sorted set."""
+
+    @staticmethod
+    def bump(video_id, weight: float):
+        """Add an event of the given weight to a video's score in O(log n)."""
+        try:
+            _bump(keys=[TRENDING_KEY, EPOCH_KEY], args=[str(video_id), weight, time.time(), HALF_LIFE, REBASE_AFTER])
+        except Exception as e:
+            # Trending is derived data; a lost event must not fail the request
+            print(f"Error updating trending score: {e}")
+
+    @staticmethod
+    def remove(*video_ids):
+        if not video_ids:
+            return
+        try:
+            CacheStorage.zrem(TRENDING_KEY, *[str(id) for id in video_ids])
+        except redis.RedisError as e:
+            # get_trending skips members whose video is gone
+            print(f"Error removing trending videos: {e}")
+
+    @staticmethod
+    def top(limit: int) -> list:
+        """IDs of the limit highest scored videos."""
+        return [id.decode('utf-8') for id in CacheStorage.zrevrange(TRENDING_KEY, 0, limit - 1)]
+
+    @staticmethod
+    def replace(scores: dict, epoch: float):
+        """Atomically swap the sorted set for scores computed against epoch."""
+        staging_key = f"{TRENDING_KEY}:rebuild"
+        pipe = CacheStorage.pipeline(transaction=True)
+        pipe.delete(staging_key)
+        if scores:
+            pipe.zadd(staging_key, scores)
+            pipe.rename(staging_key, TRENDING_KEY)
+        else:
+            pipe.delete(TRENDING_KEY)
+        pipe.set(EPOCH_KEY, epoch)
+        pipe.execute()
@@ -0,0 +1,144 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import redis
+from ..extensions import CacheStorage
+
+QUEUE_KEY = "upload:queue"
+# Job IDs a worker has claimed and not yet finished
+PROCESSING_KEY = "upload:processing"
+JOB_TTL = 24 * 60 * 60
+# Minimum seconds between progress writes of one job
+PROGRESS_INTERVAL = 1.0
+
+
+def _key(job_id: str) -> str:
+    return f"upload:job:{job_id}"
+
+
+# Move a claimed job back to the queue unless another reaper already did
+_requeue = CacheStorage.register_script("""
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('LPUSH', KEYS[2], ARGV[1])
+return 1
+""")
+
+
+class UploadJobs:
+    """
+    Background upload jobs: a hash per job (upload:job:<id>) holding its
+    files, status and progress, and a list the workers pop job IDs from.
+    A popped job moves to a processing list until ack(), so jobs of a worker
+    that died are found by requeue_stale(). Job hashes expire after JOB_TTL
+    so finished jobs can still be polled.
+    """
+
+    @staticmethod
+    def enqueue(job_id: str, job: dict):
+        pipe = CacheStorage.pipeline()
+        pipe.hset(_key(job_id), mapping={
+            **job, "status": "queued", "sent": 0, "total": 0, "created_at": time.time(),
+        })
+        pipe.expire(_key(job_id), JOB_TTL)
+        pipe.lpush(QUEUE_KEY, job_id)
+        pipe.execute()
+
+    @staticmethod
+    def pop(timeout: int = 5):
+        """Block up to timeout seconds for the next job ID and claim it."""
+        item = CacheStorage.blmove(QUEUE_KEY, PROCESSING_KEY, timeout, src="RIGHT", dest="LEFT")
+        if item is None:
+            return None
+        job_id = item.decode("utf-8")
+        pipe = CacheStorage.pipeline()
+        pipe.hset(_key(job_id), "heartbeat", time.time())
+        pipe.hincrby(_key(job_id), "attempts", 1)
+        pipe.execute()
+        return job_id
+
+    @staticmethod
+    def ack(job_id: str):
+        """Release a claimed job once it is done or failed."""
+        CacheStorage.lrem(PROCESSING_KEY, 1, job_id)
+
+    @staticmethod
+    def requeue_stale(timeout: int, max_attempts: int) -> list:
+        """
+        Put back claimed jobs without a heartbeat for timeout seconds, i.e.
+        whose worker died. Jobs out of attempts, or whose hash expired, are
+        released instead; returns their IDs so their videos can be failed.
+        """
+        abandoned = []
+        now = time.time()
+        for item in CacheStorage.lrange(PROCESSING_KEY, 0, -1):
+            job_id = item.decode("utf-8")
+            job = UploadJobs.get(job_id)
+            if job is not None and now - float(job.get("heartbeat", 0)) < timeout:
+                continue
+            if job is not None and int(job.get("attempts", 0)) < max_attempts:
+                if _requeue(keys=[PROCESSING_KEY, QUEUE_KEY], args=[job_id]):
+                    UploadJobs.update(job_id, status="queued")
+                    print(f"Upload job {job_id} requeued after its worker stopped")
+                continue
+            if CacheStorage.lrem(PROCESSING_KEY, 1, job_id):
+                if job is not None:
+                    UploadJobs.update(job_id, status="failed", error="Upload worker stopped")
+                abandoned.append(job)
+        return [job for job in abandoned if job is not None]
+
+    @staticmethod
+    def get(job_id: str):
+        job = CacheStorage.hgetall(_key(job_id))
+        if not job:
+            return None
+        return {key.decode("utf-8"): value.decode("utf-8") for key, value in job.items()}
+
+    @staticmethod
+    def update(job_id: str, **fields):
+        try:
+            CacheStorage.hset(_key(job_id), mapping=fields)
+        except redis.RedisError as e:
+            print(f"Upload job {job_id} update failed: {e}")
+
+
+class UploadProgress:
+    """
+    Sums the bytes sent by the concurrent transfers of one job and writes
+    the total to the job hash at most every PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, job_id: str, total: int):
+        self.job_id = job_id
+        self.total = total
+        self._sent = {}
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def callback(self, name: str, size: int):
+        """on_progress(sent, length) for the transfer of a file of size bytes."""
+        def report(sent: int, length: int):
+            with self._lock:
+                self._sent[name] = min(sent, size)
+                now = time.monotonic()
+                if now - self._last < PROGRESS_INTERVAL and sent < length:
+                    return
+                self._last = now
+                sent_total = sum(self._sent.values())
+            # Progress doubles as the heartbeat requeue_stale() checks
+            UploadJobs.update(self.job_id, sent=min(sent_total, self.total), heartbeat=time.time())
+        return report
+
+
+_transfer_pool = None
+_transfer_pool_lock = threading.Lock()
+
+
+def transfer_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide pool bounding the storage transfers running at once."""
+    global _transfer_pool
+    with _transfer_pool_lock:
+        if _transfer_pool is None:
+            _transfer_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload-transfer")
+        return _transfer_pool
@@ -0,0 +1,141 @@
+import json
+import os
+import time
+import uuid
+from werkzeug.exceptions import ClientDisconnected
+from ..extensions import CacheStorage
+from ..exceptions import ConflictError
+
+# PATCH bodies of resumable uploads carry raw bytes at Upload-Offset
+CHUNK_MIMETYPE = "application/offset+octet-stream"
+SESSION_TTL = 24 * 60 * 60
+LOCK_TTL = 10 * 60
+# Staging files younger than this are never swept, even without a session
+SWEEP_GRACE = 60
+
+
+def _key(session_id: str) -> str:
+    return f"upload:session:{session_id}"
+
+
+def _path(staging_dir: str, session_id: str) -> str:
+    return os.path.join(staging_dir, "sessions", f"{session_id}.part")
+
+
+class UploadSessions:
+    """
+    Resumable uploads: the session hash (upload:session:<id>) stores the
+    metadata, declared size and the number of contiguous bytes received,
+    and chunks are appended to a staging file. Sessions expire SESSION_TTL
+    after their last chunk; sweep() removes the files they leave behind.
+    """
+
+    @staticmethod
+    def create(staging_dir: str, user_id: str, meta: dict, size: int) -> str:
+        session_id = uuid.uuid4().hex
+        path = _path(staging_dir, session_id)
+        pipe = CacheStorage.pipeline()
+        pipe.hset(_key(session_id), mapping={
+            "user_id": str(user_id),
+            "meta": json.dumps(meta),
+            "size": size,
+            "offset": 0,
+            "path": path,
+            "created_at": time.time(),
+        })
+        pipe.expire(_key(session_id), SESSION_TTL)
+        pipe.execute()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        return session_id
+
+    @staticmethod
+    def get(session_id: str):
+        session = CacheStorage.hgetall(_key(session_id))
+        if not session:
+            return None
+        session = {key.decode("utf-8"): value.decode("utf-8") for key, value in session.items()}
+        session["meta"] = json.loads(session["meta"])
+        session["size"] = int(session["size"])
+        session["offset"] = int(session["offset"])
+        session["expires_in"] = CacheStorage.ttl(_key(session_id))
+        return session
+
+    @staticmethod
+    def append(session_id: str, offset: int, stream, buffer_size: int) -> int:
+        """
+        Append stream to the staging file if offset matches the bytes received
+        so far; returns the new offset. Bytes read before a client disconnect
+        are kept, so the client resumes from where the connection dropped.
+        """
+        lock = f"{_key(session_id)}:lock"
+        if not CacheStorage.set(lock, 1, nx=True, ex=LOCK_TTL):
+            raise ConflictError("Another chunk of this upload is in progress")
+        try:
+            session = UploadSessions.get(session_id)
+            if session is None:
+                raise ValueError("Upload session is expired")
+            if offset != session["offset"]:
+                raise ConflictError(f"Upload-Offset must be {session['offset']}")
+
+            remaining = session["size"] - offset
+            written = 0
+            with open(session["path"], "r+b") as file:
+                # Drop anything past the recorded offset from an interrupted write
+                file.seek(offset)
+                file.truncate()
+                try:
+                    while True:
+                        chunk = stream.read(buffer_size)
+                        if not chunk:
+                            break
+                        written += len(chunk)
+                        if written > remaining:
+                            file.truncate(offset)
+                            raise ValueError("Chunk exceeds the declared upload size")
+                        file.write(chunk)
+                except ClientDisconnected:
+                    file.flush()
+                    UploadSessions._advance(session_id, offset + written)
+                    raise
+
+            UploadSessions._advance(session_id, offset + written)
+            return offset + written
+        finally:
+            CacheStorage.delete(lock)
+
+    @staticmethod
+    def _advance(session_id: str, offset: int):
+        pipe = CacheStorage.pipeline()
+        pipe.hset(_key(session_id), "offset", offset)
+        pipe.expire(_key(session_id), SESSION_TTL)
+        pipe.execute()
+
+    @staticmethod
+    def delete(session_id: str, session: dict, keep_file: bool = False):
+        CacheStorage.delete(_key(session_id))
+        if not keep_file:
+            try:
+                os.remove(session["path"])
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def sweep(staging_dir: str) -> int:
+        """Remove staging files whose session has expired; returns how many."""
+        directory = os.path.join(staging_dir, "sessions")
+        if not os.path.isdir(directory):
+            return 0
+        removed = 0
+        now = time.time()
+        for entry in os.scandir(directory):
+            session_id, ext = os.path.splitext(entry.name)
+            if ext != ".part" or now - entry.stat().st_mtime < SWEEP_GRACE:
+                continue
+            if not CacheStorage.exists(_key(session_id)):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
@@ -0,0 +1,17 @@
+from tempfile import SpooledTemporaryFile
+from flask import Request, current_app
+
+
+class SpoolingRequest(Request):
+    """
+    Keeps uploaded files in memory only up to UPLOAD_SPOOL_THRESHOLD bytes
+    and spools anything larger to UPLOAD_TMP_DIR. Bodies over
+    MAX_CONTENT_LENGTH are rejected with 413 before the form is parsed.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(
+            max_size=current_app.config["UPLOAD_SPOOL_THRESHOLD"],
+            mode="rb+",
+            dir=current_app.config["UPLOAD_TMP_DIR"],
+        )
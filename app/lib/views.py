@@ -0,0 +1,143 @@
+import atexit
+import threading
+import time
+import uuid
+from ..extensions import CacheStorage
+
+PENDING_KEY = "views:pending"
+# Batches detached by take() and not yet acknowledged, by hash key
+FLUSHING_KEY = "views:flushing"
+# A batch still unacknowledged after this many seconds belongs to a dead flush
+FLUSHING_TIMEOUT = 5 * 60
+
+_detach = CacheStorage.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('SADD', KEYS[3], KEYS[2])
+return 1
+""")
+
+# Add a detached batch back to the pending hash and forget it
+_merge = CacheStorage.register_script("""
+local entries = redis.call('HGETALL', KEYS[2])
+for i = 1, #entries, 2 do
+    redis.call('HINCRBY', KEYS[1], entries[i], entries[i + 1])
+end
+redis.call('DEL', KEYS[2])
+redis.call('SREM', KEYS[3], KEYS[2])
+return #entries / 2
+""")
+
+
+class ViewCounter:
+    """Per-video view deltas buffered in a CacheStorage hash until the next flush."""
+
+    @staticmethod
+    def incr(video_id) -> int:
+        """Count one view and return the delta still waiting to be flushed."""
+        return CacheStorage.hincrby(PENDING_KEY, str(video_id), 1)
+
+    @staticmethod
+    def pending(video_ids: list) -> dict:
+        """Unflushed deltas for video_ids, read with a single HMGET."""
+        if not video_ids:
+            return {}
+        values = CacheStorage.hmget(PENDING_KEY, [str(id) for id in video_ids])
+        return {str(id): int(value) for id, value in zip(video_ids, values) if value}
+
+    @staticmethod
+    def take():
+        """
+        Atomically detach every pending delta as a batch, so views counted
+        while the flush runs land in a fresh hash. The batch stays in Redis
+        until ack() or restore(); returns (batch, deltas), or (None, {}).
+        """
+        batch = f"{FLUSHING_KEY}:{int(time.time())}:{uuid.uuid4().hex}"
+        if not _detach(keys=[PENDING_KEY, batch, FLUSHING_KEY]):
+            return None, {}
+        deltas = CacheStorage.hgetall(batch)
+        return batch, {id.decode('utf-8'): int(delta) for id, delta in deltas.items()}
+
+    @staticmethod
+    def ack(batch: str):
+        """Forget a batch once its deltas are committed to the database."""
+        pipe = CacheStorage.pipeline()
+        pipe.delete(batch)
+        pipe.srem(FLUSHING_KEY, batch)
+        pipe.execute()
+
+    @staticmethod
+    def restore(batch: str):
+        """Put back a batch that could not be written to the database."""
+        _merge(keys=[PENDING_KEY, batch, FLUSHING_KEY])
+
+    @staticmethod
+    def recover() -> int:
+        """
+        Put back batches left unacknowledged for FLUSHING_TIMEOUT by a flush
+        that died between take() and ack(). Returns the number recovered.
+        A flush that died after its commit but before ack() is counted twice.
+        """
+        deadline = time.time() - FLUSHING_TIMEOUT
+        recovered = 0
+        for batch in CacheStorage.smembers(FLUSHING_KEY):
+            batch = batch.decode('utf-8')
+            if int(batch.split(":")[2]) < deadline:
+                ViewCounter.restore(batch)
+                recovered += 1
+        return recovered
+
+
+class ViewFlusher:
+    """Background thread that periodically applies buffered views to Postgres."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app, flush):
+        self.app = app
+        self.flush = flush
+        self._lock = threading.Lock()
+        # Started by the first request, so CLI commands and workers that
+        # build the app never run a flusher
+        app.before_request(self._start)
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            interval = self.app.config.get("VIEW_FLUSH_INTERVAL", 0)
+            if interval <= 0:
+                self._thread = False
+                return
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name="view-flusher", daemon=True
+            )
+            self._thread.start()
+            # Unflushed deltas are written on graceful shutdown
+            atexit.register(self.shutdown)
+
+    def _flush(self):
+        with self.app.app_context():
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing views: {e}")
+
+    def _run(self, interval: int):
+        while not self._stop.wait(interval):
+            self._flush()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._flush()
+
+
+view_flusher = ViewFlusher()
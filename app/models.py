@@ -1,23 +1,31 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, JSON, ForeignKey, Table
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, String, Integer, BigInteger, SmallInteger, DateTime, JSON, ForeignKey, Table, Index, Computed,
+    CheckConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from .extensions import db
 
 # Association tables for many-to-many relationships
-user_liked_videos = Table(
-    "user_liked_videos",
-    db.Model.metadata,
-    Column("user_id", UUID(as_uuid=True), ForeignKey("user.id"), primary_key=True),
-    Column("video_id", UUID(as_uuid=True), ForeignKey("video.id"), primary_key=True),
-)
+REACTION_LIKE = 1
+REACTION_DISLIKE = -1
+
+# Video.status: uploads are processing until the worker has stored their files
+VIDEO_PROCESSING = "processing"
+VIDEO_READY = "ready"
+VIDEO_FAILED = "failed"
 
-user_disliked_videos = Table(
-    "user_disliked_videos",
+video_reaction = Table(
+    "video_reaction",
     db.Model.metadata,
-    Column("user_id", UUID(as_uuid=True), ForeignKey("user.id"), primary_key=True),
-    Column("video_id", UUID(as_uuid=True), ForeignKey("video.id"), primary_key=True),
+    Column("user_id", UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("video_id", UUID(as_uuid=True), ForeignKey("video.id", ondelete="CASCADE"), primary_key=True),
+    # REACTION_LIKE or REACTION_DISLIKE; one reaction per user and video
+    Column("value", SmallInteger, nullable=False),
+    CheckConstraint("value IN (-1, 1)", name="ck_video_reaction_value"),
+    Index("ix_video_reaction_video_id", "video_id"),
 )
 
 video_tags = Table(
@@ -25,6 +33,8 @@ video_tags = Table(
     db.Model.metadata,
     Column("video_id", UUID(as_uuid=True), ForeignKey("video.id"), primary_key=True),
     Column("tag_id", UUID(as_uuid=True), ForeignKey("tag.id"), primary_key=True),
+    # The primary key leads with video_id; filtering by tag needs tag_id first
+    Index("ix_video_tags_tag_id_video_id", "tag_id", "video_id"),
 )
 
 
@@ -46,12 +56,6 @@ class User(db.Model):
 
     videos = relationship("Video", back_populates="user", cascade="all, delete-orphan")
     shorts = relationship("Short", back_populates="user", cascade="all, delete-orphan")
-    liked_videos = relationship(
-        "Video", secondary=user_liked_videos, back_populates="liked_by"
-    )
-    disliked_videos = relationship(
-        "Video", secondary=user_disliked_videos, back_populates="disliked_by"
-    )
     comments = relationship(
         "Comment", back_populates="user", cascade="all, delete-orphan"
     )
@@ -62,6 +66,11 @@ class User(db.Model):
 
 class Video(db.Model):
     __tablename__ = "video"
+    __table_args__ = (
+        # Keyset pagination of listings walks (created_at, id) newest first
+        Index("ix_video_created_at_id", "created_at", "id"),
+        Index("ix_video_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -72,35 +81,60 @@ class Video(db.Model):
     title = Column(String(255), nullable=False)
 
     views = Column(Integer, default=0)
+    # like_count/dislike_count follow video_reaction through the
+    # video_reaction_counts trigger; comment_count is kept by the comment writes
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    dislike_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
     src = Column(JSON, nullable=False)
     properties = Column(JSON, nullable=False)
     thumbnail = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default=VIDEO_READY, server_default=VIDEO_READY)
+
+    # Maintained by Postgres; titles rank above descriptions
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
 
     user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"))
     user = relationship("User", back_populates="videos")
-    liked_by = relationship(
-        "User", secondary=user_liked_videos, back_populates="liked_videos"
-    )
-    disliked_by = relationship(
-        "User", secondary=user_disliked_videos, back_populates="disliked_videos"
-    )
     tags = relationship("Tag", secondary=video_tags, back_populates="videos")
+    # Comments and their reply threads are removed by the database cascade
     comments = relationship(
-        "Comment", back_populates="video", cascade="all, delete-orphan"
+        "Comment", back_populates="video", cascade="all, delete-orphan", passive_deletes=True
     )
 
 
 class Comment(db.Model):
     __tablename__ = "comment"
+    __table_args__ = (
+        # A page of a video's comments is one range scan
+        Index("ix_comment_video_id_created_at", "video_id", "created_at"),
+        Index("ix_comment_parent_id", "parent_id"),
+        # Prefix (LIKE 'root/%') lookups of a thread's replies
+        Index("ix_comment_path", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
+    )
 
     id = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )  # Automatically generate UUID
     text = Column(String, nullable=False)
 
-    video_id = Column(UUID(as_uuid=True), ForeignKey("video.id"))
+    video_id = Column(UUID(as_uuid=True), ForeignKey("video.id", ondelete="CASCADE"))
     video = relationship("Video", back_populates="comments")
 
+    # Replies: parent_id is the direct parent, path lists the hex IDs from the
+    # top-level comment down to this one ("<root>/<child>/..."), depth is 0 for top-level
+    parent_id = Column(UUID(as_uuid=True), ForeignKey("comment.id", ondelete="CASCADE"), nullable=True)
+    path = Column(String, nullable=False)
+    depth = Column(Integer, nullable=False, default=0, server_default="0")
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"))
     user = relationship("User", back_populates="comments")
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -130,3 +164,36 @@ class Short(db.Model):
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MediaBlob(db.Model):
+    """
+    One stored file shared by every upload with the same content. The file is
+    removed from storage when the last reference to it is released.
+    """
+    __tablename__ = "media_blob"
+
+    hash = Column(String(64), primary_key=True)  # Hex SHA-256 of the content
+    file_id = Column(String, unique=True, nullable=False)
+    url = Column(String, nullable=False)
+    refcount = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StorageDeletion(db.Model):
+    """
+    A stored file waiting for `flask storage worker` to delete it, written in
+    the same transaction as the change that stopped referencing it.
+    """
+    __tablename__ = "storage_outbox"
+    __table_args__ = (
+        # The worker claims due rows oldest first
+        Index("ix_storage_outbox_next_attempt_at", "next_attempt_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    file_id = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -3,4 +3,5 @@ from .user_route import user_route
 from .video_route import video_route
 from .tags_route import tags_route
 from .comment_route import comment_route
-from .reactions_route import reaction_route
\ No newline at end of file
+from .reactions_route import reaction_route
+from .media_route import media_route
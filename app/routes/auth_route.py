@@ -1,5 +1,5 @@
 from marshmallow import ValidationError
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, current_app, request, jsonify, make_response
 import uuid
 from flask_jwt_extended import (
     create_access_token,
@@ -14,15 +14,15 @@ from flask_mail import Message
 from ..schemas import RegisterSchema, VerifySchema, CreateUserSchema, LoginUserSchema
 from ..models import User
 from ..extensions import CacheStorage, mailer
-from ..constants import IMAGE_FILE_TYPES
-from ..storage import Storage
+from ..constants import IMAGE_FILE_TYPES, PROFILE_IMAGE_WIDTHS
 from ..services import AuthService
-from ..utils import template_mail
-from imagekitio.file import UploadFileRequestOptions
+from ..utils import template_mail, media_file_ids
 from ..lib.utils import return_decoded_value
+from ..lib.rate_limit import rate_limit
+from ..lib.image_variants import create_variants, read_image
+from ..lib.blobs import MediaBlobs
 import app
 import os
-import base64
 import datetime
 
 # Create the Blueprint
@@ -30,6 +30,7 @@ auth_route = Blueprint("Auth", __name__)
 
 
 @auth_route.route("/register", methods=["POST"])
+@rate_limit("auth-register", "5/hour")
 def register():
     """Register Route"""
     try:
@@ -101,6 +102,7 @@ def verifyUser():
 def createUser():
     """Create verified user"""
     res = None  # Initialize res to None at the beginning
+    file_info = None
     try:
         # Validating request body
         schema = CreateUserSchema()
@@ -149,16 +151,13 @@ def createUser():
                     400,
                 )
 
-            # Read the file buffer
-            file_buffer = base64.b64encode(file.read())
+            image = read_image(file.stream, current_app.config["MAX_IMAGE_SIZE"])
             random_name = os.urandom(12).hex() + ext_name
 
-            res = Storage.upload_file(
-                file=file_buffer,
-                file_name=random_name,
-                options=UploadFileRequestOptions(folder="odysee/user"),
-            )
+            # Stream the spooled file to the storage server unless it is already stored
+            res = MediaBlobs.store(file.stream, random_name, "odysee/user", file.mimetype)
             file_info = {"fileId": res.file_id, "url": res.url, "is_default": False}
+            file_info["sizes"] = create_variants(image, "odysee/user", PROFILE_IMAGE_WIDTHS)
 
         # Register the user with or without the file
         user = AuthService.register_user(
@@ -189,14 +188,19 @@ def createUser():
         return jsonify(err.messages), 400
     except Exception as e:
         # Handle all other exceptions
-        if res:  # Only attempt to delete the file if res was defined
-            Storage.delete_file(res.file_id)
+        if file_info:
+            MediaBlobs.discard(media_file_ids(file_info))
+        elif res:  # Only attempt to release the file if res was defined
+            MediaBlobs.discard([res.file_id])
+        if isinstance(e, ValueError):
+            return jsonify({"message": str(e)}), 400
         return (
             jsonify({"error": "An unexpected error occurred", "message": str(e)}),
             500,
         )
 
 @auth_route.route("/login", methods=["POST"])
+@rate_limit("auth-login", "10/minute")
 def login_user():
     try:
         schema = LoginUserSchema()
@@ -2,11 +2,16 @@ from flask import (Blueprint, request, jsonify, make_response)
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from ..schemas import CreateComment
 from ..services import CommentService
+from ..lib.http_cache import conditional
+from ..lib.rate_limit import rate_limit
+from ..utils import clamp_page_size
+from ..constants import DEFAULT_REPLIES_PER_THREAD, MAX_REPLIES_PER_THREAD
 
 comment_route = Blueprint('Comments', __name__)
 
 @comment_route.route('/write/<string:id>', methods=["POST"])
 @jwt_required()
+@rate_limit("comment-write", "30/minute")
 def write_comment(id:str):
     user_id = get_jwt_identity()
     try:
@@ -16,8 +21,11 @@ def write_comment(id:str):
         return jsonify({"message":"OK", "data":{
             "user_id": comment.user_id,
             "video_id":comment.video_id,
+            "parent_id":comment.parent_id,
             "text":comment.text
         }}), 200
+    except ValueError as e:
+        return make_response(jsonify({"message": str(e)}), 400)
     except Exception as e:
         return make_response(
             jsonify({"message": "An unexpected error occurred.", "details": str(e)}), 500
@@ -48,6 +56,7 @@ def delete_comment(comment_id):
 
 
 @comment_route.route("/video/<string:video_id>", methods=["GET"])
+@conditional(lambda video_id: [f"comments-{video_id}"])
 def get_video_comments(video_id):
     try:
         if not CommentService.is_video_available(video_id):
@@ -55,12 +64,44 @@ def get_video_comments(video_id):
                 "message":f"Not found in video ID {video_id}"
             })), 404
         
-        comments = CommentService.get_comments(video_id)
+        cursor = request.args.get('cursor')
+        limit = clamp_page_size(request.args.get('limit', type=int))
+        comments, next_cursor = CommentService.get_comments(video_id, cursor, limit)
         return make_response(jsonify({
             "message":"OK",
-            "data":comments
+            "data":comments,
+            "next_cursor":next_cursor
         }))
+    except ValueError as e:
+        return make_response(jsonify({"message": str(e)}), 400)
     except Exception as e:
         return make_response(
             jsonify({"message": "An unexpected error occurred.", "details": str(e)}), 500
-        )
\ No newline at end of file
+        )
+
+@comment_route.route("/video/<string:video_id>/threads", methods=["GET"])
+@conditional(lambda video_id: [f"comments-{video_id}"])
+def get_video_threads(video_id):
+    """Top-level comments with their first ?replies= replies each"""
+    try:
+        if not CommentService.is_video_available(video_id):
+            return make_response(jsonify({
+                "message":f"Not found in video ID {video_id}"
+            })), 404
+
+        cursor = request.args.get('cursor')
+        limit = clamp_page_size(request.args.get('limit', type=int))
+        replies = request.args.get('replies', DEFAULT_REPLIES_PER_THREAD, type=int)
+        replies = max(0, min(replies, MAX_REPLIES_PER_THREAD))
+        threads, next_cursor = CommentService.get_threads(video_id, cursor, limit, replies)
+        return make_response(jsonify({
+            "message":"OK",
+            "data":threads,
+            "next_cursor":next_cursor
+        }))
+    except ValueError as e:
+        return make_response(jsonify({"message": str(e)}), 400)
+    except Exception as e:
+        return make_response(
+            jsonify({"message": "An unexpected error occurred.", "details": str(e)}), 500
+        )
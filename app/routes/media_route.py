@@ -0,0 +1,45 @@
+import mimetypes
+import os
+from flask import Blueprint, abort, current_app, send_from_directory
+from ..storage import LocalStorage
+
+media_route = Blueprint("Media", __name__)
+
+# Stored names are random and never rewritten, so clients may cache for good
+MEDIA_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@media_route.route("/<path:file_id>", methods=["GET"])
+def serve_media(file_id):
+    """
+    Files of the local storage backend. With MEDIA_ACCEL_REDIRECT (nginx) or
+    USE_X_SENDFILE (Apache mod_xsendfile, lighttpd) the response only names
+    the file and the front server sends it, Range requests included, with
+    its own sendfile. Otherwise werkzeug answers: whole files through
+    wsgi.file_wrapper, ranges with 206 read and copied in Python.
+    """
+    backend = current_app.extensions["storage"]
+    if not isinstance(backend, LocalStorage):
+        abort(404)
+
+    accel_prefix = current_app.config["MEDIA_ACCEL_REDIRECT"]
+    if not accel_prefix and not current_app.config["USE_X_SENDFILE"]:
+        return send_from_directory(backend.root, file_id, conditional=True, max_age=MEDIA_MAX_AGE)
+
+    try:
+        path = backend.path(file_id)
+    except ValueError:
+        abort(404)
+    if not os.path.isfile(path):
+        abort(404)
+
+    # No body and no range handling here: the front server answers Range and
+    # If-* headers for the file itself, so the status stays 200
+    response = current_app.response_class(mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream")
+    if accel_prefix:
+        response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{file_id}"
+    else:
+        response.headers["X-Sendfile"] = path
+    response.cache_control.public = True
+    response.cache_control.max_age = MEDIA_MAX_AGE
+    return response
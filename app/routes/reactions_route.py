@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import ValidationError
 from uuid import UUID
 from ..services import ReactionsService
+from ..schemas import ReactionStatsSchema
 from ..extensions import db
+from ..lib.identity import get_optional_user_id
 
 reaction_route = Blueprint("reaction", __name__)
 
@@ -60,20 +63,7 @@ def get_liked_and_disliked_users(video_id: str):
         video_id_uuid = UUID(video_id)  # Convert video_id to UUID
 
         # Extract user_id from JWT token in cookie (if available)
-        user_id = None
-        jwt_token = request.cookies.get("refresh_token_cookie")  # Replace with your cookie name
-
-        if jwt_token:
-            try:
-                # Decode the JWT token to get the user ID
-                from flask_jwt_extended import decode_token
-                decoded_token = decode_token(jwt_token)
-                user_id = decoded_token["sub"]  # Assuming "sub" contains the user ID
-                user_id = UUID(user_id)  # Convert user_id to UUID
-            except Exception as e:
-                print(f"Error decoding JWT token: {e}")
-                # If the JWT token is invalid, treat the user as unauthenticated
-                user_id = None
+        user_id = get_optional_user_id()
 
         result = ReactionsService.get_liked_and_disliked_users(db.session, video_id_uuid, user_id)
         if "error" in result:
@@ -84,4 +74,25 @@ def get_liked_and_disliked_users(video_id: str):
     except ValueError:
         return jsonify({"message": "Invalid video ID"}), 400
     except Exception as e:
-        return jsonify({"message": "An error occurred", "details": str(e)}), 500
\ No newline at end of file
+        return jsonify({"message": "An error occurred", "details": str(e)}), 500
+
+@reaction_route.route("/stats", methods=["POST"])
+def get_reaction_stats():
+    """
+    Like/dislike/comment counts and the current user's reaction
+    for a batch of videos, e.g. a whole feed page.
+    """
+    try:
+        schema = ReactionStatsSchema()
+        data = schema.load(request.get_json())
+
+        result = ReactionsService.get_stats(db.session, data["video_ids"], get_optional_user_id())
+        if "error" in result:
+            return jsonify(result), 500
+
+        return jsonify({"message": "OK", "data": result}), 200
+
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+    except Exception as e:
+        return jsonify({"message": "An error occurred", "details": str(e)}), 500
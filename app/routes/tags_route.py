@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from ..schemas import CreateTagScheme
-from ..services import TagsService
+from ..services import TagsService, VideoService
+from ..utils import clamp_page_size, is_valid_uuid
+from ..lib.http_cache import conditional
 
 tags_route = Blueprint("Tags", __name__)
 
@@ -36,6 +38,7 @@ def create():
         )
 
 @tags_route.route('/all', methods=["GET"])
+@conditional(lambda: ["tag-list"])
 def get_tags():
     try:
         tags = TagsService.get_all()
@@ -89,3 +92,27 @@ def delete_tag(tag_id):
             jsonify({"error": "An unexpected error occurred", "message": str(e)}),
             500,
         )
+
+
+@tags_route.route('/<string:tag_id>/videos', methods=["GET"])
+@conditional(lambda tag_id: ["video-list"])
+def get_tag_videos(tag_id):
+    try:
+        if not is_valid_uuid(tag_id) or not TagsService.get_tag_by_id(tag_id):
+            return jsonify({"message": "Tag not found"}), 404
+        cursor = request.args.get('cursor')
+        limit = clamp_page_size(request.args.get('limit', type=int))
+        videos, next_cursor = VideoService.get_all(cursor, limit, tags=[tag_id])
+        return jsonify({
+            'message':"Ready",
+            "data":videos,
+            "next_cursor":next_cursor
+        })
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    except Exception as e:
+        # Handle all other exceptions
+        return (
+            jsonify({"error": "An unexpected error occurred", "message": str(e)}),
+            500,
+        )
@@ -1,4 +1,4 @@
-from flask import Blueprint, make_response, jsonify, request
+from flask import Blueprint, current_app, make_response, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from marshmallow import ValidationError
 from sqlalchemy.inspection import inspect
@@ -7,11 +7,11 @@ from sqlalchemy.exc import SQLAlchemyError
 from ..services import UserService
 from ..schemas import UpdateUserSchema
 from ..extensions import db
-from ..utils import serialize_data
-from ..storage import Storage
+from ..utils import serialize_data, media_file_ids
+from ..constants import PROFILE_IMAGE_WIDTHS
+from ..lib.image_variants import create_variants, read_image
+from ..lib.blobs import MediaBlobs
 import os
-import base64
-from imagekitio.file import UploadFileRequestOptions
 user_route = Blueprint("User", __name__)
 
 @user_route.route("/me", methods=["GET"])
@@ -77,6 +77,7 @@ def update_user():
 
         # Commit changes to the database
         db.session.commit()
+        UserService.profile_changed(user_identity)
 
         return (
             jsonify(
@@ -141,27 +142,19 @@ def upload_profile_img():
                 400,
             )
 
-        # Read the file buffer
-        file_buffer = base64.b64encode(file.read())
+        image = read_image(file.stream, current_app.config["MAX_IMAGE_SIZE"])
         random_name = os.urandom(12).hex() + ext_name
 
-        # Upload the file to the storage server
-        res = Storage.upload_file(
-            file=file_buffer,
-            file_name=random_name,
-            options=UploadFileRequestOptions(folder="odysee/user"),
-        )
+        # Stream the spooled file to the storage server unless it is already stored
+        res = MediaBlobs.store(file.stream, random_name, "odysee/user", file.mimetype)
         file_info = {"fileId": res.file_id, "url": res.url, "is_default": False}
+        # Resized WebP variants, recorded as a size map next to the original
+        file_info["sizes"] = create_variants(image, "odysee/user", PROFILE_IMAGE_WIDTHS)
 
-        # Check if the current profile image is not default before deleting
+        # Release the current image and its variants in the same transaction
+        # as the update; the storage worker deletes the unreferenced files
         if user.profile_img and not user.profile_img.get("is_default", True):
-            try:
-                # Verify that the file exists before attempting to delete it
-                Storage.file.get_file_version_details(user.profile_img["fileId"])  # Check if the file exists
-                Storage.delete_file(user.profile_img["fileId"])  # Delete the file
-            except Exception as e:
-                # Log the error but continue with the update
-                print(f"Error deleting file: {e}")
+            MediaBlobs.release(media_file_ids(user.profile_img))
 
         # Update user info in the database
         res = UserService.upload_image(user_id, file_info)
@@ -176,9 +169,10 @@ def upload_profile_img():
 
     except SQLAlchemyError as db_error:
         # Handle database-related errors gracefully
+        db.session.rollback()
         if file_info is not None:
             try:
-                Storage.delete_file(file_info["fileId"])  # Clean up the uploaded file
+                MediaBlobs.discard(media_file_ids(file_info))  # Release the uploaded files
             except Exception as e:
                 print(f"Error deleting file during cleanup: {e}")
         return make_response(
@@ -186,11 +180,14 @@ def upload_profile_img():
             500,
         )
     except Exception as e:
+        db.session.rollback()
         if file_info is not None:
             try:
-                Storage.delete_file(file_info["fileId"])  # Clean up the uploaded file
+                MediaBlobs.discard(media_file_ids(file_info))  # Release the uploaded files
             except Exception as cleanup_error:
                 print(f"Error deleting file during cleanup: {cleanup_error}")
+        if isinstance(e, ValueError):
+            return jsonify({"message": str(e)}), 400
         # Handle unexpected errors
         return make_response(
             jsonify({"error": "An unexpected error occurred.", "details": str(e)}), 500
@@ -206,7 +203,8 @@ def delete_profile_img():
             return jsonify({
                 "message":"Unable to delete default image"
             }),400
-        Storage.delete_file(user.profile_img['fileId'])
+        # Committed together with the reset to the default image
+        MediaBlobs.release(media_file_ids(user.profile_img))
         res = UserService.delete_profile_img(user_id, default_file)
         user_data = {
                 "id": str(res.id),  # Convert UUID to string if necessary    
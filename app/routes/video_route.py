@@ -1,14 +1,25 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, make_response, request
+from uuid import UUID
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
-from ..schemas import CreateContentSchema
-from ..services import VideoService
-from ..exceptions import NotFoundError
+from ..schemas import CreateContentSchema, CreateUploadSessionSchema
+from ..services import VideoService, ReactionsService, CommentService
+from ..exceptions import NotFoundError, ConflictError
+from ..extensions import db
+from ..utils import clamp_page_size, is_valid_uuid
+from ..lib.identity import get_optional_user_id
+from ..lib.http_cache import conditional
+from ..constants import DEFAULT_PAGE_SIZE
+from ..lib.cache import VideoListCache
+from ..lib.rate_limit import rate_limit
+from ..lib.upload_jobs import UploadJobs
+from ..lib.upload_sessions import UploadSessions, CHUNK_MIMETYPE
 
 video_route = Blueprint("Video", __name__)
 
 @video_route.route('/upload', methods=["POST"])
 @jwt_required()
+@rate_limit("video-upload", "10/hour")
 def upload_content():
     user_id = get_jwt_identity()
     try:
@@ -25,28 +36,86 @@ def upload_content():
         description = validated_data['description']
         tags = validated_data['tags']
 
-        # Загружаем видео с помощью сервиса
-        video = VideoService.upload_video(request, title, description, user_id, tags)
+        # Файлы сохраняются в staging, загрузку в хранилище выполняет воркер
+        video, job_id = VideoService.upload_video(request, title, description, user_id, tags)
 
+        response = jsonify({
+            'message': "Video is processing",
+            'job_id': job_id,
+            'data': VideoService.serialize(video)
+        })
+        response.headers['Location'] = f"{request.path}/{job_id}"
+        return response, 202
+
+    except ValidationError as err:
+        return jsonify(err.messages), 400
+
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    except Exception as e:
+        return jsonify({"message": "An unexpected error occurred", "error": str(e)}), 500
+    
+
+@video_route.route('/upload/<string:job_id>', methods=["GET"])
+@jwt_required()
+def get_upload_status(job_id):
+    user_id = get_jwt_identity()
+    try:
+        job = UploadJobs.get(job_id)
+        if job is None or job["user_id"] != str(user_id):
+            return jsonify({"message": f"Upload job is not found with ID {job_id}"}), 404
+
+        sent, total = int(job["sent"]), int(job["total"])
         return jsonify({
-            'message': "Video is created",
-            'data': {
-                "id": str(video.id),
-                "title": video.title,
-                "description": video.description,
-                "src": video.src,
-                "thumbnail": video.thumbnail,
-                "tags": [{"id": str(tag.id), "title": tag.title} for tag in video.tags],
-                "created_at": video.created_at.isoformat() if video.created_at else None,
-                "updated_at": video.updated_at.isoformat() if video.updated_at else None,
-                "properties": {
-                    "duration": video.properties['duration'],
-                    "height": video.properties['height'],
-                    "width": video.properties['width'],
-                },
-            }
+            "job_id": job_id,
+            "status": job["status"],
+            "video_id": job["video_id"],
+            "progress": {
+                "sent": sent,
+                "total": total,
+                "percent": round(sent * 100 / total, 1) if total else 0,
+            },
+            "error": job.get("error"),
         }), 200
 
+    except Exception as e:
+        return jsonify({"message": "An unexpected error occurred", "error": str(e)}), 500
+
+
+def _session_response(session_id: str, session: dict, status: int):
+    response = jsonify({
+        "session_id": session_id,
+        "offset": session["offset"],
+        "size": session["size"],
+        "expires_in": session["expires_in"],
+    })
+    response.headers["Upload-Offset"] = str(session["offset"])
+    response.headers["Upload-Length"] = str(session["size"])
+    response.headers["Cache-Control"] = "no-store"
+    return response, status
+
+
+def _owned_session(session_id: str, user_id: str):
+    session = UploadSessions.get(session_id)
+    if session is None or session["user_id"] != str(user_id):
+        return None
+    return session
+
+
+@video_route.route('/uploads', methods=["POST"])
+@jwt_required()
+@rate_limit("video-upload", "10/hour")
+def create_upload_session():
+    """Start a resumable upload; chunks are sent with PATCH /uploads/<session_id>."""
+    user_id = get_jwt_identity()
+    try:
+        data = CreateUploadSessionSchema().load(request.get_json())
+        session = VideoService.create_upload_session(user_id, data)
+        response, status = _session_response(session["session_id"], session, 201)
+        response.headers["Location"] = f"{request.path}/{session['session_id']}"
+        return response, status
+
     except ValidationError as err:
         return jsonify(err.messages), 400
 
@@ -55,31 +124,181 @@ def upload_content():
 
     except Exception as e:
         return jsonify({"message": "An unexpected error occurred", "error": str(e)}), 500
-    
+
+
+@video_route.route('/uploads/<string:session_id>', methods=["GET"])
+@jwt_required()
+def get_upload_session(session_id):
+    """Offset to resume from; HEAD returns just the Upload-Offset header."""
+    session = _owned_session(session_id, get_jwt_identity())
+    if session is None:
+        return jsonify({"message": f"Upload session is not found with ID {session_id}"}), 404
+    return _session_response(session_id, session, 200)
+
+
+@video_route.route('/uploads/<string:session_id>', methods=["PATCH"])
+@jwt_required()
+def upload_chunk(session_id):
+    """Append the raw request body at the Upload-Offset header."""
+    try:
+        session = _owned_session(session_id, get_jwt_identity())
+        if session is None:
+            return jsonify({"message": f"Upload session is not found with ID {session_id}"}), 404
+        if request.mimetype != CHUNK_MIMETYPE:
+            return jsonify({"message": f"Content-Type must be {CHUNK_MIMETYPE}"}), 415
+        offset = request.headers.get("Upload-Offset", type=int)
+        if offset is None:
+            return jsonify({"message": "Upload-Offset header is required"}), 400
+
+        new_offset = UploadSessions.append(
+            session_id, offset, request.stream, current_app.config["UPLOAD_BUFFER_SIZE"]
+        )
+        response = make_response("", 204)
+        response.headers["Upload-Offset"] = str(new_offset)
+        return response
+
+    except ConflictError as e:
+        session = UploadSessions.get(session_id)
+        response = jsonify({"message": str(e)})
+        if session:
+            response.headers["Upload-Offset"] = str(session["offset"])
+        return response, 409
+
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    except Exception as e:
+        return jsonify({"message": "An unexpected error occurred", "error": str(e)}), 500
+
+
+@video_route.route('/uploads/<string:session_id>/finalize', methods=["POST"])
+@jwt_required()
+def finalize_upload_session(session_id):
+    """Queue a fully received upload; form-data carries the thumbnail."""
+    try:
+        session = _owned_session(session_id, get_jwt_identity())
+        if session is None:
+            return jsonify({"message": f"Upload session is not found with ID {session_id}"}), 404
+        if "thumbnail" not in request.files:
+            raise ValueError("Thumbnail image for video is required!")
+
+        video, job_id = VideoService.finalize_upload_session(
+            session_id, session, request.files["thumbnail"]
+        )
+        response = jsonify({
+            'message': "Video is processing",
+            'job_id': job_id,
+            'data': VideoService.serialize(video)
+        })
+        response.headers['Location'] = f"/video/upload/{job_id}"
+        return response, 202
+
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    except Exception as e:
+        return jsonify({"message": "An unexpected error occurred", "error": str(e)}), 500
+
+
+@video_route.route('/uploads/<string:session_id>', methods=["DELETE"])
+@jwt_required()
+def cancel_upload_session(session_id):
+    session = _owned_session(session_id, get_jwt_identity())
+    if session is None:
+        return jsonify({"message": f"Upload session is not found with ID {session_id}"}), 404
+    UploadSessions.delete(session_id, session)
+    return jsonify({"message": f"Upload session {session_id} is cancelled"}), 200
+
 
 @video_route.route('/all',methods=["GET"])
+@conditional(lambda: ["video-list"])
 def get_all_contents():
     try:
-        videos = VideoService.get_all()
+        cursor = request.args.get('cursor')
+        limit = clamp_page_size(request.args.get('limit', type=int))
+        # ?tags=<id>&tags=<id>&match=all|any
+        tags = [UUID(tag) for tag in request.args.getlist('tags')]
+        match = request.args.get('match', 'any')
+        if match not in ('any', 'all'):
+            raise ValueError("match must be either 'any' or 'all'")
+        videos, next_cursor = VideoService.get_all(cursor, limit, tags=tags, match_all=match == 'all')
         return jsonify({
             'message':"Ready",
-            "data":videos
+            "data":videos,
+            "next_cursor":next_cursor
         })
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
     except Exception as e:
         # Handle all other exceptions
         return (
             jsonify({"error": "An unexpected error occurred", "message": str(e)}),
             500,
         )
+@video_route.route('/search', methods=["GET"])
+def search_contents():
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({"message": "Query parameter q is required"}), 400
+        cursor = request.args.get('cursor')
+        limit = clamp_page_size(request.args.get('limit', type=int))
+        videos, next_cursor = VideoService.search(q, cursor, limit)
+        return jsonify({
+            'message':"Ready",
+            "data":videos,
+            "next_cursor":next_cursor
+        })
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    except Exception as e:
+        return (
+            jsonify({"error": "An unexpected error occurred", "message": str(e)}),
+            500,
+        )
+
+@video_route.route('/trending', methods=["GET"])
+def get_trending():
+    try:
+        limit = clamp_page_size(request.args.get('limit', type=int))
+        videos = VideoService.get_trending(limit)
+        return jsonify({
+            'message':"Ready",
+            "data":videos
+        })
+    except Exception as e:
+        return (
+            jsonify({"error": "An unexpected error occurred", "message": str(e)}),
+            500,
+        )
+
+@video_route.route('/cache/stats', methods=["GET"])
+def get_cache_stats():
+    """Hit/miss counters of the listing cache"""
+    try:
+        return jsonify({
+            "message": "Ready",
+            "data": VideoListCache.stats()
+        })
+    except Exception as e:
+        return (
+            jsonify({"error": "An unexpected error occurred", "message": str(e)}),
+            500,
+        )
+
 @video_route.route('/video/<string:video_id>')
+@conditional(
+    lambda video_id: [f"video-{video_id}"],
+    # A revalidated watch page is still a view, if the video exists
+    not_modified=lambda video_id: VideoService.count_revalidated_view(video_id),
+)
 def get_video(video_id):
     try:
-        # Проверяем, существует ли видео
-        if not VideoService.video_exists(video_id):
+        # Получаем видео по ID; None значит, что видео не существует
+        content = VideoService.get_video_by_id(video_id) if is_valid_uuid(video_id) else None
+        if content is None:
             raise NotFoundError(f"Content is not found with ID {video_id}")
 
-        # Получаем видео по ID
-        content = VideoService.get_video_by_id(video_id)
         return jsonify({
             "message": "Ready",
             "data": content
@@ -96,6 +315,52 @@ def get_video(video_id):
             "error": str(e)
         }), 500
 
+DETAIL_SECTIONS = ("reactions", "comments")
+
+@video_route.route('/<string:video_id>/detail', methods=["GET"])
+def get_video_detail(video_id):
+    """
+    Everything a watch page needs in one request: the video with its tags and
+    owner card, reaction stats and the first page of comments.
+    ?include=reactions,comments selects the optional sections (default: all).
+    """
+    try:
+        include = request.args.get('include')
+        sections = DETAIL_SECTIONS if include is None else [
+            section.strip() for section in include.split(',') if section.strip()
+        ]
+        unknown = set(sections) - set(DETAIL_SECTIONS)
+        if unknown:
+            return jsonify({"message": f"Unknown include sections: {', '.join(sorted(unknown))}"}), 400
+
+        content = VideoService.get_video_by_id(video_id) if is_valid_uuid(video_id) else None
+        if content is None:
+            raise NotFoundError(f"Content is not found with ID {video_id}")
+
+        data = {"video": content}
+        if "reactions" in sections:
+            stats = ReactionsService.get_stats(db.session, [video_id], get_optional_user_id())
+            if "error" in stats:
+                raise Exception(stats["error"])
+            data["reactions"] = stats.get(content["id"])
+        if "comments" in sections:
+            comments, next_cursor = CommentService.get_comments(video_id, limit=DEFAULT_PAGE_SIZE)
+            data["comments"] = {"data": comments, "next_cursor": next_cursor}
+
+        return jsonify({
+            "message": "Ready",
+            "data": data
+        }), 200
+
+    except NotFoundError as e:
+        return jsonify({"message": str(e)}), 404
+
+    except Exception as e:
+        return jsonify({
+            "message": "An unexpected error occurred",
+            "error": str(e)
+        }), 500
+
 @video_route.route('/delete/<string:video_id>', methods=["DELETE"])
 @jwt_required()
 def delete_video(video_id):
@@ -1,4 +1,5 @@
 from marshmallow import Schema, fields, validate
+from .constants import MAX_PAGE_SIZE
 
 
 class RegisterSchema(Schema):
@@ -47,8 +48,19 @@ class CreateContentSchema(Schema):
     description = fields.String(required=False, validate=validate.Length(min=10, max=255))
     title = fields.String(required=True, validate=validate.Length(min=10, max=80))
     tags = fields.List(fields.UUID(),required=True)
+
+class CreateUploadSessionSchema(CreateContentSchema):
+    filename = fields.String(required=True, validate=validate.Length(min=1, max=255))
+    size = fields.Integer(required=True, validate=validate.Range(min=1))
+
 class CreateTagScheme(Schema):
     title = fields.String(required=True, validate=validate.Length(min=3, max=20))
 
 class CreateComment(Schema):
-    text = fields.String(required=True, validate=validate.Length(min=1, max=256))
\ No newline at end of file
+    text = fields.String(required=True, validate=validate.Length(min=1, max=256))
+    parent_id = fields.UUID(required=False)
+
+class ReactionStatsSchema(Schema):
+    video_ids = fields.List(
+        fields.UUID(), required=True, validate=validate.Length(min=1, max=MAX_PAGE_SIZE)
+    )
@@ -1,18 +1,52 @@
 from ..extensions import db
 from ..models import Comment, User, Video
+from sqlalchemy import tuple_, update, func, or_
 from sqlalchemy.orm import joinedload
+from ..constants import DEFAULT_PAGE_SIZE, DEFAULT_REPLIES_PER_THREAD
+from ..utils import encode_cursor, decode_cursor
+from .video_service import VideoService
+from ..lib.http_cache import purge_surrogate_keys
+from ..lib.comment_window import CommentWindow, WINDOW_SIZE
+from ..lib import trending
+from ..lib.trending import Trending
 import uuid
 
 class CommentService:
     @staticmethod
     def createComment(user_id:str,video_id:str, data):
+        """Create a comment, or a reply when data carries parent_id."""
+        parent = None
+        if data.get('parent_id'):
+            parent = Comment.query.get(data['parent_id'])
+            if not parent or str(parent.video_id) != str(video_id):
+                raise ValueError(f"Parent comment is not found with ID {data['parent_id']}")
+
+        id = uuid.uuid4()
         comment = Comment(
+            id = id,
             text = data['text'],
             video_id = video_id,
-            user_id = user_id
+            user_id = user_id,
+            parent_id = parent.id if parent else None,
+            path = f"{parent.path}/{id.hex}" if parent else id.hex,
+            depth = parent.depth + 1 if parent else 0
         )
         db.session.add(comment)
+        if parent:
+            db.session.execute(
+                update(Comment).where(Comment.id == parent.id)
+                .values(reply_count=Comment.reply_count + 1)
+                .execution_options(synchronize_session=False)
+            )
+        VideoService.adjust_counters(db.session, video_id, comment_count=1)
         db.session.commit()
+        if parent:
+            # The cached parent's reply_count is now stale
+            CommentWindow.drop(video_id)
+        else:
+            CommentWindow.push(video_id, CommentService.serialize(comment))
+        purge_surrogate_keys(f"comments-{video_id}")
+        Trending.bump(video_id, trending.COMMENT_WEIGHT)
         return comment
     
     @staticmethod
@@ -62,12 +96,14 @@ class CommentService:
 
 
 
-    @staticmethod 
-    def get_comments(video_id:str)->list:
-        comments = Comment.query.filter(Comment.video_id==video_id)
-        return [{
+    @staticmethod
+    def serialize(comment: Comment) -> dict:
+        return {
             "id":comment.id,
             "text":comment.text,
+            "parent_id":comment.parent_id,
+            "depth":comment.depth,
+            "reply_count":comment.reply_count,
             "user":{
                 "id":comment.user.id,
                 "first_name":comment.user.first_name,
@@ -75,13 +111,123 @@ class CommentService:
                 "profile_img":comment.user.profile_img
             },
             "created_at": comment.created_at.isoformat() if comment.created_at else None, 
-                 } for comment in comments]
+        }
+
+    @staticmethod
+    def _with_authors(query):
+        # Authors are joined in the same query, restricted to the fields the response uses
+        return query.options(
+            joinedload(Comment.user).load_only(
+                User.id, User.first_name, User.last_name, User.profile_img
+            )
+        )
+
+    @staticmethod 
+    def get_comments(video_id:str, cursor:str = None, limit:int = DEFAULT_PAGE_SIZE,
+                     top_level_only:bool = False):
+        """
+        One page of a video's comments, newest first, and the cursor of the next page.
+        The first page of the full feed is served from the Redis comment window;
+        deeper pages and thread listings go to the database.
+        """
+        if cursor is None and not top_level_only and limit <= WINDOW_SIZE:
+            cached = CommentWindow.first_page(video_id, limit)
+            if cached is not None:
+                return cached
+            generation = CommentWindow.generation(video_id)
+            comments, next_cursor = CommentService._query_comments(
+                video_id, None, WINDOW_SIZE, top_level_only
+            )
+            CommentWindow.fill(video_id, comments, complete=next_cursor is None, generation=generation)
+            if len(comments) > limit:
+                comments = comments[:limit]
+                next_cursor = encode_cursor(comments[-1]["created_at"], comments[-1]["id"])
+            return comments, next_cursor
+
+        return CommentService._query_comments(video_id, cursor, limit, top_level_only)
+
+    @staticmethod
+    def _query_comments(video_id:str, cursor:str, limit:int, top_level_only:bool):
+        query = CommentService._with_authors(Comment.query) \
+            .filter(Comment.video_id==video_id) \
+            .order_by(Comment.created_at.desc(), Comment.id.desc())
+        if top_level_only:
+            query = query.filter(Comment.parent_id.is_(None))
+
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Comment.created_at, Comment.id) < (created_at, last_id))
+
+        # Fetch one extra row to know whether another page exists
+        comments = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(comments) > limit:
+            comments = comments[:limit]
+            next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+
+        return [CommentService.serialize(comment) for comment in comments], next_cursor
+
+    @staticmethod
+    def get_threads(video_id:str, cursor:str = None, limit:int = DEFAULT_PAGE_SIZE,
+                    replies:int = DEFAULT_REPLIES_PER_THREAD):
+        """
+        One page of top-level comments, each with its first replies (oldest
+        first, any depth). All replies of the page come from a single
+        path-prefix query ranked per thread.
+        """
+        threads, next_cursor = CommentService.get_comments(
+            video_id, cursor, limit, top_level_only=True
+        )
+        for thread in threads:
+            thread["replies"] = []
+        if not threads or replies < 1:
+            return threads, next_cursor
+
+        roots = [uuid.UUID(str(thread["id"])).hex for thread in threads]
+        root = func.split_part(Comment.path, '/', 1)
+        ranked = db.session.query(
+            Comment.id.label("id"),
+            func.row_number().over(
+                partition_by=root, order_by=(Comment.created_at, Comment.id)
+            ).label("position"),
+        ).filter(
+            Comment.video_id == video_id,
+            Comment.depth > 0,
+            or_(*[Comment.path.like(f"{prefix}/%") for prefix in roots]),
+        ).subquery()
+
+        rows = CommentService._with_authors(Comment.query) \
+            .join(ranked, ranked.c.id == Comment.id) \
+            .filter(ranked.c.position <= replies) \
+            .order_by(Comment.created_at, Comment.id)
+
+        by_root = {uuid.UUID(str(thread["id"])).hex: thread for thread in threads}
+        for reply in rows:
+            by_root[reply.path.split('/', 1)[0]]["replies"].append(CommentService.serialize(reply))
+        return threads, next_cursor
 
     @staticmethod
     def delete_comment(comment_id:str):
         comment = Comment.query.get(comment_id)
         if comment:
+            # Replies go with the comment through the database cascade
+            descendants = db.session.query(func.count(Comment.id)) \
+                .filter(Comment.path.like(f"{comment.path}/%")).scalar()
+            if comment.parent_id:
+                db.session.execute(
+                    update(Comment).where(Comment.id == comment.parent_id)
+                    .values(reply_count=Comment.reply_count - 1)
+                    .execution_options(synchronize_session=False)
+                )
             db.session.delete(comment)
+            VideoService.adjust_counters(
+                db.session, comment.video_id, comment_count=-(1 + descendants)
+            )
             db.session.commit()
+            if descendants or comment.parent_id:
+                CommentWindow.drop(comment.video_id)
+            else:
+                CommentWindow.remove(comment.video_id, comment.id)
+            purge_surrogate_keys(f"comments-{comment.video_id}")
             return True
         return False
\ No newline at end of file
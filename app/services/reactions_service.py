@@ -1,36 +1,89 @@
+from sqlalchemy import and_, null, select, text
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from uuid import UUID
-from ..models import Video, User
+from ..models import Video, video_reaction, REACTION_LIKE, REACTION_DISLIKE
+from ..lib import trending
+from ..lib.trending import Trending
+
+TRENDING_WEIGHTS = {
+    REACTION_LIKE: trending.LIKE_WEIGHT,
+    REACTION_DISLIKE: trending.DISLIKE_WEIGHT,
+}
+
+# One statement per toggle: remove the reaction if it already has this value,
+# otherwise insert or flip it. previous/current come from the rows the
+# statement actually changed, so a concurrent identical toggle that finds the
+# work already done changes nothing and reports no change. The video counters
+# follow the rows through the video_reaction_counts trigger.
+TOGGLE_REACTION = text("""
+WITH removed AS (
+    DELETE FROM video_reaction
+    WHERE user_id = CAST(:user_id AS uuid) AND video_id = CAST(:video_id AS uuid)
+        AND value = CAST(:value AS smallint)
+    RETURNING value
+),
+upserted AS (
+    INSERT INTO video_reaction (user_id, video_id, value)
+    SELECT CAST(:user_id AS uuid), CAST(:video_id AS uuid), CAST(:value AS smallint)
+    WHERE NOT EXISTS (SELECT 1 FROM removed)
+    ON CONFLICT (user_id, video_id) DO UPDATE SET value = EXCLUDED.value
+        WHERE video_reaction.value IS DISTINCT FROM EXCLUDED.value
+    RETURNING value, (xmax = 0) AS inserted
+)
+SELECT
+    CASE
+        WHEN EXISTS (SELECT 1 FROM removed) THEN (SELECT value FROM removed)
+        WHEN EXISTS (SELECT 1 FROM upserted) THEN (SELECT -value FROM upserted WHERE NOT inserted)
+        -- Nothing changed: the reaction already had this value
+        ELSE CAST(:value AS smallint)
+    END AS previous,
+    CASE WHEN EXISTS (SELECT 1 FROM removed) THEN NULL ELSE CAST(:value AS smallint) END AS current,
+    EXISTS (SELECT 1 FROM video WHERE id = CAST(:video_id AS uuid)) AS found
+""")
+
 
 class ReactionsService:
+    @staticmethod
+    def toggle_reaction(db: Session, video_id: UUID, user_id: UUID, value: int):
+        """
+        Toggle a like or dislike with a single statement.
+        Returns the (previous, current) reaction values, or None when the
+        video or the user does not exist.
+        """
+        try:
+            row = db.execute(
+                TOGGLE_REACTION,
+                {"user_id": str(user_id), "video_id": str(video_id), "value": value},
+            ).one()
+        except IntegrityError:
+            # Foreign key violation: unknown user or video
+            db.rollback()
+            return None
+        if not row.found:
+            db.rollback()
+            return None
+        db.commit()
+
+        weight = TRENDING_WEIGHTS.get(row.current, 0) - TRENDING_WEIGHTS.get(row.previous, 0)
+        if weight:
+            Trending.bump(video_id, weight)
+        return row.previous, row.current
+
     @staticmethod
     def toggle_like(db: Session, video_id: UUID, user_id: UUID) -> dict:
         """
         Toggle like for a video.
         If the user already liked the video, remove the like.
-        If the user disliked the video, remove the dislike and add a like.
+        If the user disliked the video, replace the dislike with a like.
         """
         try:
-            video = db.query(Video).filter(Video.id == video_id).first()
-            user = db.query(User).filter(User.id == user_id).first()
-
-            if not video or not user:
+            result = ReactionsService.toggle_reaction(db, video_id, user_id, REACTION_LIKE)
+            if result is None:
                 return {"error": "Video or user not found"}
 
-            if user in video.liked_by:
-                # User already liked the video, so remove the like
-                video.liked_by.remove(user)
-                db.commit()
+            if result[1] is None:
                 return {"message": "Like removed", "liked": False}
-
-            # Remove user from disliked_by (if present)
-            if user in video.disliked_by:
-                video.disliked_by.remove(user)
-
-            # Add user to liked_by
-            video.liked_by.append(user)
-            db.commit()
             return {"message": "Video liked", "liked": True}
 
         except SQLAlchemyError as e:
@@ -43,35 +96,22 @@ class ReactionsService:
         """
         Toggle dislike for a video.
         If the user already disliked the video, remove the dislike.
-        If the user liked the video, remove the like and add a dislike.
+        If the user liked the video, replace the like with a dislike.
         """
         try:
-            video = db.query(Video).filter(Video.id == video_id).first()
-            user = db.query(User).filter(User.id == user_id).first()
-
-            if not video or not user:
+            result = ReactionsService.toggle_reaction(db, video_id, user_id, REACTION_DISLIKE)
+            if result is None:
                 return {"error": "Video or user not found"}
 
-            if user in video.disliked_by:
-                # User already disliked the video, so remove the dislike
-                video.disliked_by.remove(user)
-                db.commit()
+            if result[1] is None:
                 return {"message": "Dislike removed", "disliked": False}
-
-            # Remove user from liked_by (if present)
-            if user in video.liked_by:
-                video.liked_by.remove(user)
-
-            # Add user to disliked_by
-            video.disliked_by.append(user)
-            db.commit()
             return {"message": "Video disliked", "disliked": True}
 
         except SQLAlchemyError as e:
             db.rollback()
             print(f"Error toggling dislike: {e}")
             return {"error": "An error occurred"}
-        
+
     @staticmethod
     def get_liked_and_disliked_users(db: Session, video_id: UUID, user_id: UUID = None) -> dict:
         """
@@ -79,29 +119,64 @@ class ReactionsService:
         and whether the current user has liked or disliked it (if authenticated).
         """
         try:
-            video = db.query(Video).filter(Video.id == video_id).first()
-            if not video:
+            # Counters are denormalized on the video and the user's state is a
+            # primary-key probe, so this is one query whatever the popularity
+            reaction = null()
+            if user_id:
+                reaction = select(video_reaction.c.value).where(
+                    video_reaction.c.user_id == user_id,
+                    video_reaction.c.video_id == video_id,
+                ).scalar_subquery()
+
+            row = db.query(
+                Video.like_count,
+                Video.dislike_count,
+                reaction.label("reaction"),
+            ).filter(Video.id == video_id).first()
+            if not row:
                 return {"error": "Video not found"}
 
-            # Get the count of likes and dislikes
-            liked_users_count = len(video.liked_by)
-            disliked_users_count = len(video.disliked_by)
+            return {
+                "liked_users_count": row.like_count,
+                "disliked_users_count": row.dislike_count,
+                "user_has_liked": row.reaction == REACTION_LIKE,
+                "user_has_disliked": row.reaction == REACTION_DISLIKE
+            }
 
-            # Check if the current user has liked or disliked the video (if authenticated)
-            user_has_liked = False
-            user_has_disliked = False
+        except SQLAlchemyError as e:
+            print(f"Error fetching liked/disliked users: {e}")
+            return {"error": "An error occurred"}
 
+    @staticmethod
+    def get_stats(db: Session, video_ids: list, user_id: UUID = None) -> dict:
+        """
+        Counts and the current user's reaction for many videos in one query,
+        keyed by video ID. Unknown IDs are left out.
+        """
+        try:
+            query = db.query(
+                Video.id,
+                Video.like_count,
+                Video.dislike_count,
+                Video.comment_count,
+                video_reaction.c.value if user_id else null().label("value"),
+            ).filter(Video.id.in_(video_ids))
             if user_id:
-                user_has_liked = any(user.id == user_id for user in video.liked_by)
-                user_has_disliked = any(user.id == user_id for user in video.disliked_by)
+                query = query.outerjoin(video_reaction, and_(
+                    video_reaction.c.video_id == Video.id,
+                    video_reaction.c.user_id == user_id,
+                ))
 
             return {
-                "liked_users_count": liked_users_count,
-                "disliked_users_count": disliked_users_count,
-                "user_has_liked": user_has_liked,
-                "user_has_disliked": user_has_disliked
+                str(row.id): {
+                    "liked_users_count": row.like_count,
+                    "disliked_users_count": row.dislike_count,
+                    "comment_count": row.comment_count,
+                    "user_has_liked": row.value == REACTION_LIKE,
+                    "user_has_disliked": row.value == REACTION_DISLIKE
+                } for row in query
             }
 
         except SQLAlchemyError as e:
-            print(f"Error fetching liked/disliked users: {e}")
-            return {"error": "An error occurred"}
\ No newline at end of file
+            print(f"Error fetching reaction stats: {e}")
+            return {"error": "An error occurred"}
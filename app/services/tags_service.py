@@ -1,5 +1,7 @@
 from ..extensions import db
 from ..models import Tag
+from ..lib.http_cache import purge_surrogate_keys
+from .video_service import VideoService
 
 
 class TagsService:
@@ -11,6 +13,7 @@ class TagsService:
         tag = Tag(title=title)
         db.session.add(tag)
         db.session.commit()
+        purge_surrogate_keys("tag-list")
         return tag
     @staticmethod
     def tag_exists(title: str) -> bool:
@@ -45,11 +48,16 @@ class TagsService:
         if tag:
             tag.title = title
             db.session.commit()
+            VideoService.videos_changed(VideoService.tagged_video_ids(tag_id))
+            purge_surrogate_keys("tag-list")
 
     @staticmethod
     def delete_tag(tag_id:str):
         """Delete specific tag with ID"""
         tag = Tag.query.get(tag_id)
         if tag:
+            video_ids = VideoService.tagged_video_ids(tag_id)
             db.session.delete(tag)
-            db.session.commit()
\ No newline at end of file
+            db.session.commit()
+            VideoService.videos_changed(video_ids)
+            purge_surrogate_keys("tag-list")
\ No newline at end of file
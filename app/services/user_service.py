@@ -1,7 +1,11 @@
-from ..models import User
-from ..storage import Storage
+from ..models import User, Comment
+from ..lib.blobs import MediaBlobs
+from ..utils import media_file_ids
 from ..extensions import db
 from ..models import User
+from .video_service import VideoService
+from ..lib.comment_window import CommentWindow
+from ..lib.http_cache import purge_surrogate_keys
 
 class UserService:
     @staticmethod
@@ -22,11 +26,24 @@ class UserService:
             }
             return user_data
 
+    @staticmethod
+    def profile_changed(user_id: str):
+        """Rewrite cached video fragments and comment pages that embed this user's card."""
+        VideoService.videos_changed(VideoService.owned_video_ids(user_id))
+        commented = [
+            row.video_id for row in
+            db.session.query(Comment.video_id).filter(Comment.user_id == user_id).distinct()
+        ]
+        for video_id in commented:
+            CommentWindow.drop(video_id)
+        purge_surrogate_keys(*[f"comments-{video_id}" for video_id in commented])
+
     @staticmethod
     def upload_image(user_id:str, fileInfo:dict = None):
         user = User.query.get(user_id)
         user.profile_img = fileInfo
         db.session.commit()
+        UserService.profile_changed(user_id)
         return user
     
     @staticmethod
@@ -34,13 +51,15 @@ class UserService:
         user = User.query.get(user_id)
         user.profile_img = def_info
         db.session.commit()
+        UserService.profile_changed(user_id)
         return user
 
     @staticmethod
     def delete_me(user):
-        if user.videos:
-            for video in user.videos:
-                Storage.delete_file(video.src.id)
-        if user.shorts:
-            for shorts in user.shorts:
-                Storage.delete_file(shorts.src.id)
+        file_ids = []
+        for video in user.videos:
+            file_ids += media_file_ids(video.src) + media_file_ids(video.thumbnail)
+        for shorts in user.shorts:
+            file_ids += media_file_ids(shorts.src)
+        # Files shared with other uploads stay stored
+        MediaBlobs.discard(file_ids)
@@ -1,142 +1,646 @@
 import os
-import base64
+import mimetypes
+import shutil
+import time
 import uuid
+from concurrent.futures import wait
+from datetime import datetime, timedelta, timezone
 
 from ..storage import Storage
-from imagekitio.file import UploadFileRequestOptions
 from ..extensions import db
-from ..constants import VIDEO_FILE_TYPES, IMAGE_FILE_TYPES
-from ..models import Video, Tag
-from sqlalchemy import exists
-from ..utils import is_valid_uuid
+from ..constants import (VIDEO_FILE_TYPES, IMAGE_FILE_TYPES, VIDEO_CONTAINERS, DEFAULT_PAGE_SIZE,
+                         THUMBNAIL_WIDTHS)
+from flask import current_app
+from ..models import Video, Tag, video_tags, VIDEO_PROCESSING, VIDEO_READY, VIDEO_FAILED
+from sqlalchemy import exists, select, tuple_, update, values, column, func, cast, literal, Integer, REAL
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import joinedload, selectinload
+from ..utils import is_valid_uuid, encode_cursor, decode_cursor, media_file_ids, save_sha256
+from ..utils.media_probe import probe_video
+from ..lib.cache import VideoListCache
+from ..lib.http_cache import purge_surrogate_keys
+from ..lib.fragments import VideoFragments
+from ..lib.comment_window import CommentWindow
+from ..lib.views import ViewCounter
+from ..lib import trending
+from ..lib.trending import Trending
+from ..lib.upload_jobs import UploadJobs, UploadProgress, transfer_pool
+from ..lib.upload_sessions import UploadSessions
+from ..lib.image_variants import create_variants
+from ..lib.blobs import MediaBlobs
 
 class VideoService:
     @staticmethod
     def upload_video(request, title: str, description: str, user_id: str, tags: list):
         # Проверка наличия файлов
-        print(request.files)
         if "video" not in request.files:
             raise ValueError("Video is required!")
         if "thumbnail" not in request.files:
             raise ValueError("Thumbnail image for video is required!")
 
-        # Обработка видео
         video_file = request.files['video']
-        if video_file.filename == '':
-            raise ValueError("No file selected for video")
-        video_ext = os.path.splitext(video_file.filename)[1]
-        if video_ext not in VIDEO_FILE_TYPES:
-            raise ValueError(f"Unsupported file type {video_ext.replace('.', '').capitalize()} for video")
-
-        # Обработка миниатюры
+        video_ext = VideoService.check_file(video_file, VIDEO_FILE_TYPES, "video")
+        properties = VideoService.probe_properties(video_file.stream, video_ext)
         thumbnail_file = request.files['thumbnail']
-        if thumbnail_file.filename == '':
-            raise ValueError("No file selected for thumbnail")
-        thumbnail_ext = os.path.splitext(thumbnail_file.filename)[1]
-        if thumbnail_ext not in IMAGE_FILE_TYPES:
-            raise ValueError(f"Unsupported file type {thumbnail_ext.replace('.', '').capitalize()} for thumbnail")
-
-        # Загрузка видео
-        video_buffer = base64.b64encode(video_file.read())
-        video_name = os.urandom(12).hex() + video_ext
-        video = Storage.upload_file(
-            file=video_buffer,
-            file_name=video_name,
-            options=UploadFileRequestOptions(folder="odysee/contents"),
+        thumbnail_ext = VideoService.check_file(
+            thumbnail_file, IMAGE_FILE_TYPES, "thumbnail", current_app.config["MAX_IMAGE_SIZE"]
         )
-        video_info = {"fileId": video.file_id, "url": video.url}
-
-        # Загрузка миниатюры
-        thumbnail_buffer = base64.b64encode(thumbnail_file.read())
-        thumbnail_name = os.urandom(12).hex() + thumbnail_ext
-        thumbnail = Storage.upload_file(
-            file=thumbnail_buffer,
-            file_name=thumbnail_name,
-            options=UploadFileRequestOptions(folder="odysee/contents/thumbnails"),
+        list_of_tags = VideoService.resolve_tags(tags)
+
+        # Файлы сохраняются в staging, в хранилище их загружает воркер
+        job_id = uuid.uuid4().hex
+        staging = os.path.join(current_app.config["UPLOAD_STAGING_DIR"], job_id)
+        os.makedirs(staging, exist_ok=True)
+        buffer_size = current_app.config["UPLOAD_BUFFER_SIZE"]
+        video_path = os.path.join(staging, "video" + video_ext)
+        thumbnail_path = os.path.join(staging, "thumbnail" + thumbnail_ext)
+        try:
+            # Hashed while staged, so the worker can skip a second read for deduplication
+            video_sha256 = save_sha256(video_file.stream, video_path, buffer_size)
+            thumbnail_sha256 = save_sha256(thumbnail_file.stream, thumbnail_path, buffer_size)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        return VideoService.enqueue_upload(
+            job_id, title, description, user_id, list_of_tags, properties,
+            video=(video_path, video_file.mimetype, video_sha256),
+            thumbnail=(thumbnail_path, thumbnail_file.mimetype, thumbnail_sha256),
         )
-        thumbnail_info = {"fileId": thumbnail.file_id, "url": thumbnail.url}
 
-        # Получение тегов
-        list_of_tags = Tag.query.filter(Tag.id.in_(tags)).all()
-        found_tag_ids = {tag.id for tag in list_of_tags}
-        requested_tag_ids = set(tags)
-        missing_tag_ids = requested_tag_ids - found_tag_ids
+    @staticmethod
+    def check_file(file, allowed_types: list, label: str, max_size: int = None) -> str:
+        """
+        Return the extension of an uploaded file, or raise ValueError if its
+        type or size is not allowed. Only reads the spooled file's length.
+        """
+        if file.filename == '':
+            raise ValueError(f"No file selected for {label}")
+        ext = os.path.splitext(file.filename)[1]
+        if ext not in allowed_types:
+            raise ValueError(f"Unsupported file type {ext.replace('.', '').capitalize()} for {label}")
+
+        file.stream.seek(0, os.SEEK_END)
+        size = file.stream.tell()
+        file.stream.seek(0)
+        if size == 0:
+            raise ValueError(f"File for {label} is empty")
+        if max_size is not None and size > max_size:
+            raise ValueError(f"File for {label} exceeds {max_size} bytes")
+        return ext
 
+    @staticmethod
+    def probe_properties(file, ext: str) -> dict:
+        """
+        Duration and frame size read from the video's own header, so broken or
+        mislabelled files are rejected (ValueError) before anything is stored.
+        """
+        info = probe_video(file)
+        if info.container not in VIDEO_CONTAINERS[ext]:
+            raise ValueError(f"Video content does not match its {ext} extension")
+        return {"duration": info.duration, "height": info.height, "width": info.width}
+
+    @staticmethod
+    def resolve_tags(tags: list) -> list:
+        """Load the tags with the given IDs, or raise ValueError naming the missing ones."""
+        list_of_tags = Tag.query.filter(Tag.id.in_(tags)).all()
+        missing_tag_ids = set(tags) - {tag.id for tag in list_of_tags}
         if missing_tag_ids:
             raise ValueError(f"Tags not found with IDs: {missing_tag_ids}")
+        return list_of_tags
 
-        # Создание объекта Video
+    @staticmethod
+    def create_upload_session(user_id: str, data: dict) -> dict:
+        """Start a resumable upload of a video declared by validated CreateUploadSessionSchema data."""
+        ext = os.path.splitext(data['filename'])[1]
+        if ext not in VIDEO_FILE_TYPES:
+            raise ValueError(f"Unsupported file type {ext.replace('.', '').capitalize()} for video")
+        if data['size'] > current_app.config["MAX_CONTENT_LENGTH"]:
+            raise ValueError(f"Video exceeds {current_app.config['MAX_CONTENT_LENGTH']} bytes")
+        VideoService.resolve_tags(data['tags'])
+
+        meta = {
+            "title": data['title'],
+            "description": data.get('description'),
+            "tags": [str(tag) for tag in data['tags']],
+            "ext": ext,
+            "mimetype": mimetypes.guess_type(data['filename'])[0] or "application/octet-stream",
+        }
+        session_id = UploadSessions.create(
+            current_app.config["UPLOAD_STAGING_DIR"], user_id, meta, data['size']
+        )
+        return UploadSessions.get(session_id) | {"session_id": session_id}
+
+    @staticmethod
+    def finalize_upload_session(session_id: str, session: dict, thumbnail_file):
+        """
+        Hand a fully received resumable upload to the regular upload flow:
+        the staging file becomes the job's video and a job is queued.
+        """
+        if session["offset"] != session["size"]:
+            raise ValueError(f"Upload is incomplete: {session['offset']} of {session['size']} bytes received")
+        thumbnail_ext = VideoService.check_file(
+            thumbnail_file, IMAGE_FILE_TYPES, "thumbnail", current_app.config["MAX_IMAGE_SIZE"]
+        )
+        meta = session["meta"]
+        try:
+            with open(session["path"], "rb") as file:
+                properties = VideoService.probe_properties(file, meta["ext"])
+        except ValueError:
+            # The received file will never become valid; drop the session
+            UploadSessions.delete(session_id, session)
+            raise
+        list_of_tags = VideoService.resolve_tags([uuid.UUID(tag) for tag in meta["tags"]])
+
+        job_id = uuid.uuid4().hex
+        staging = os.path.join(current_app.config["UPLOAD_STAGING_DIR"], job_id)
+        os.makedirs(staging, exist_ok=True)
+        video_path = os.path.join(staging, "video" + meta["ext"])
+        thumbnail_path = os.path.join(staging, "thumbnail" + thumbnail_ext)
+        try:
+            thumbnail_sha256 = save_sha256(
+                thumbnail_file.stream, thumbnail_path, current_app.config["UPLOAD_BUFFER_SIZE"]
+            )
+            os.replace(session["path"], video_path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        UploadSessions.delete(session_id, session, keep_file=True)
+
+        return VideoService.enqueue_upload(
+            job_id, meta["title"], meta["description"], session["user_id"], list_of_tags, properties,
+            # The video arrived in chunks over several requests; the worker hashes it
+            video=(video_path, meta["mimetype"], None),
+            thumbnail=(thumbnail_path, thumbnail_file.mimetype, thumbnail_sha256),
+        )
+
+    @staticmethod
+    def enqueue_upload(job_id: str, title: str, description: str, user_id: str, tags: list,
+                       properties: dict, video: tuple, thumbnail: tuple):
+        """
+        Create the video in the processing state and queue the transfer of its
+        staged (path, mimetype, sha256) files; sha256 is None when the file was
+        not hashed while staged. Returns the video and the job ID.
+        """
         video_data = Video(
             title=title,
-            thumbnail=thumbnail_info,
-            src=video_info,
+            thumbnail={},
+            src={},
             description=description,
-            properties={
-                "duration":video.response_metadata.raw['duration'],
-                "height": video.response_metadata.raw['height'],
-                "width": video.response_metadata.raw['width'],
-            },
+            properties=properties,
             views=0,
+            status=VIDEO_PROCESSING,
             user_id=user_id
         )
-        video_data.tags.extend(list_of_tags)
-
-        # Сохранение в базу данных
+        video_data.tags.extend(tags)
         db.session.add(video_data)
         db.session.commit()
 
-        return video_data
-    
-    @staticmethod
-    def get_all():
-        contents = Video.query.all()
-        return [{
-            "id": content.id,
-            "title": content.title,
-            "description": content.description,
-            "views": content.views,
-            "src": content.src,
-            "thumbnail": content.thumbnail,
-            "tags": [{"id": str(tag.id), "title": tag.title} for tag in content.tags],
-            "properties":{
-                "duration":content.properties['duration'],
-                "height": content.properties['height'],
-                "width": content.properties['width'],
-            },
-            "created_at": content.created_at.isoformat() if content.created_at else None, 
-            "updated_at": content.updated_at.isoformat() if content.updated_at else None,
-            "user": {
-                "username": content.user.username,  # Используем точечную нотацию
-                "first_name": content.user.first_name,
-                "last_name": content.user.last_name,
-                "profile_img":content.user.profile_img
+        try:
+            UploadJobs.enqueue(job_id, {
+                "video_id": str(video_data.id),
+                "user_id": str(user_id),
+                "staging": os.path.dirname(video[0]),
+                "video_path": video[0],
+                "video_type": video[1],
+                "video_sha256": video[2] or "",
+                "thumbnail_path": thumbnail[0],
+                "thumbnail_type": thumbnail[1],
+                "thumbnail_sha256": thumbnail[2] or "",
+            })
+        except Exception:
+            db.session.delete(video_data)
+            db.session.commit()
+            shutil.rmtree(os.path.dirname(video[0]), ignore_errors=True)
+            raise
+        return video_data, job_id
+
+    @staticmethod
+    def process_upload(job_id: str, upload=None) -> bool:
+        """
+        Worker side of an upload job: transfer the staged files with
+        upload(file, file_name, folder, content_type, on_progress) and mark
+        the video ready. Files whose content is already stored are not
+        transferred again. On failure the video is marked failed and the
+        files it referenced are released; the ones nothing else references
+        are queued in the storage outbox. The staging directory is always
+        removed. upload defaults to the configured storage backend; pass a
+        stub to run without one.
+        """
+        upload = upload or Storage.upload_stream
+        job = UploadJobs.get(job_id)
+        if job is None:
+            print(f"Upload job {job_id} expired before processing")
+            return False
+
+        video = Video.query.get(job["video_id"])
+        uploaded = []
+        try:
+            if video is None:
+                raise ValueError("Video was deleted before processing")
+
+            sizes = {name: os.path.getsize(job[f"{name}_path"]) for name in ("video", "thumbnail")}
+            total = sum(sizes.values())
+            UploadJobs.update(job_id, status="uploading", total=total)
+            progress = UploadProgress(job_id, total)
+            app = current_app._get_current_object()
+
+            def transfer(name: str, folder: str):
+                with app.app_context(), open(job[f"{name}_path"], "rb") as file:
+                    return MediaBlobs.store(
+                        file, os.urandom(12).hex() + os.path.splitext(job[f"{name}_path"])[1], folder,
+                        job[f"{name}_type"], on_progress=progress.callback(name, sizes[name]), upload=upload,
+                        digest=job.get(f"{name}_sha256") or None,
+                    )
+
+            def variants():
+                with app.app_context(), open(job["thumbnail_path"], "rb") as file:
+                    return create_variants(file.read(), "odysee/contents/thumbnails", THUMBNAIL_WIDTHS)
+
+            # Transfers and thumbnail resizing run at once; a failure of any
+            # deletes the files the others stored
+            pool = transfer_pool(current_app.config["UPLOAD_TRANSFER_THREADS"])
+            futures = {
+                "video": pool.submit(transfer, "video", "odysee/contents"),
+                "thumbnail": pool.submit(transfer, "thumbnail", "odysee/contents/thumbnails"),
+                "sizes": pool.submit(variants),
             }
-        } for content in contents]
+            wait(futures.values())
+            errors = [future.exception() for future in futures.values() if future.exception()]
+            results = {name: future.result() for name, future in futures.items() if not future.exception()}
+            uploaded = [results[name].file_id for name in ("video", "thumbnail") if name in results]
+            uploaded += [variant["fileId"] for variant in results.get("sizes", {}).values()]
+            if errors:
+                raise errors[0]
+            stored_video, stored_thumbnail = results["video"], results["thumbnail"]
+
+            video.src = {"fileId": stored_video.file_id, "url": stored_video.url}
+            video.thumbnail = {
+                "fileId": stored_thumbnail.file_id,
+                "url": stored_thumbnail.url,
+                "sizes": results["sizes"],
+            }
+            # Properties come from the local header probe; storage metadata only
+            # fills gaps, including a 0 the probe could not know better than
+            video.properties = {
+                key: video.properties.get(key) or stored_video.raw.get(key)
+                for key in ("duration", "height", "width")
+            }
+            video.status = VIDEO_READY
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Upload job {job_id} failed: {e}")
+            try:
+                MediaBlobs.discard(uploaded)
+            except Exception as cleanup_error:
+                # Unknown which files are shared; leaving them is the safe side
+                db.session.rollback()
+                print(f"Error releasing files during cleanup: {cleanup_error}")
+            try:
+                if video is not None:
+                    video.status = VIDEO_FAILED
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+            UploadJobs.update(job_id, status="failed", error=str(e))
+            return False
+        finally:
+            shutil.rmtree(job["staging"], ignore_errors=True)
+
+        UploadJobs.update(job_id, status="done", sent=total)
+        VideoService.videos_changed([video.id])
+        return True
 
     @staticmethod
-    def get_video_by_id(id:str):
-        video = Video.query.get(id)
-        if video:
-            video.views = video.views + 1
+    def fail_uploads(jobs: list):
+        """Mark the videos of abandoned upload jobs failed and drop their staged files."""
+        video_ids = [job["video_id"] for job in jobs]
+        if video_ids:
+            db.session.execute(
+                update(Video)
+                .where(Video.id.in_(video_ids), Video.status == VIDEO_PROCESSING)
+                .values(status=VIDEO_FAILED)
+                .execution_options(synchronize_session=False)
+            )
             db.session.commit()
-            return {
-            "id": video.id,
+        for job in jobs:
+            shutil.rmtree(job["staging"], ignore_errors=True)
+
+    @staticmethod
+    def fail_stale_uploads(max_age: int) -> int:
+        """
+        Mark videos still processing after max_age seconds failed: their job
+        is gone (e.g. its hash expired), so nothing will finish them.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+        result = db.session.execute(
+            update(Video)
+            .where(Video.status == VIDEO_PROCESSING, Video.created_at < cutoff)
+            .values(status=VIDEO_FAILED)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def serialize(video: Video) -> dict:
+        """Build the fragment shared by listings, the watch page and upload responses."""
+        return {
+            "id": str(video.id),
             "title": video.title,
             "description": video.description,
-            "views": video.views,
             "src": video.src,
             "thumbnail": video.thumbnail,
+            "status": video.status,
             "tags": [{"id": str(tag.id), "title": tag.title} for tag in video.tags],
-            "created_at": video.created_at.isoformat() if video.created_at else None, 
+            "properties": {
+                "duration": video.properties['duration'],
+                "height": video.properties['height'],
+                "width": video.properties['width'],
+            },
+            "created_at": video.created_at.isoformat() if video.created_at else None,
             "updated_at": video.updated_at.isoformat() if video.updated_at else None,
-            "duration":video.duration,
             "user": {
-                "username": video.user.username,  # Используем точечную нотацию
+                "username": video.user.username,
                 "first_name": video.user.first_name,
                 "last_name": video.user.last_name,
-                "profile_img":video.user.profile_img
+                "profile_img": video.user.profile_img
             }
         }
+
+    @staticmethod
+    def refresh_fragments(video_ids) -> dict:
+        """Rebuild the cached fragments of video_ids with one batched query."""
+        video_ids = list(video_ids)
+        if not video_ids:
+            return {}
+        videos = Video.query.options(
+            selectinload(Video.tags),
+            joinedload(Video.user),
+        ).filter(Video.id.in_(video_ids)).all()
+        fragments = {str(video.id): VideoService.serialize(video) for video in videos}
+        VideoFragments.set_many(fragments)
+        return fragments
+
+    @staticmethod
+    def videos_changed(video_ids, refresh: bool = True):
+        """
+        Rewrite the fragments of video_ids (unless the caller already did) and
+        invalidate cached listings and HTTP validators that include them.
+        """
+        video_ids = [str(id) for id in video_ids]
+        if refresh:
+            VideoService.refresh_fragments(video_ids)
+        VideoListCache.invalidate()
+        purge_surrogate_keys("video-list", *[f"video-{id}" for id in video_ids])
+
+    @staticmethod
+    def tagged_video_ids(tag_id) -> list:
+        """IDs of the videos carrying tag_id."""
+        rows = db.session.query(video_tags.c.video_id).filter(video_tags.c.tag_id == tag_id)
+        return [row.video_id for row in rows]
+
+    @staticmethod
+    def owned_video_ids(user_id) -> list:
+        """IDs of the videos uploaded by user_id."""
+        return [row.id for row in db.session.query(Video.id).filter(Video.user_id == user_id)]
+
+    @staticmethod
+    def get_videos_by_ids(video_ids: list, views: dict = None) -> list:
+        """
+        Assemble videos in the order of video_ids from one MGET of fragments;
+        only the IDs missing from the cache are fetched from Postgres.
+        """
+        fragments = VideoFragments.get_many(video_ids)
+        missing = [id for id in video_ids if str(id) not in fragments]
+        if missing:
+            fragments.update(VideoService.refresh_fragments(missing))
+
+        videos = []
+        for id in video_ids:
+            fragment = fragments.get(str(id))
+            if fragment is None:
+                continue  # Deleted between the listing query and assembly
+            if views is not None:
+                fragment["views"] = views.get(str(id), 0)
+            videos.append(fragment)
+        return videos
+
+    @staticmethod
+    def get_all(cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, tags: list = None,
+                match_all: bool = False):
+        """
+        Return one page of videos, newest first, and the cursor of the next page.
+        With tags, only videos carrying any of them (or all of them when
+        match_all is set) are listed, resolved through video_tags.
+        The page query reads only keys and view counts; the rest comes from
+        video fragments, and pages are served from VideoListCache until the next write.
+        """
+        tags_key = ",".join(sorted(str(tag) for tag in tags)) if tags else None
+        cache_parts = (cursor, limit, tags_key, "all" if match_all else "any")
+        version, cached = VideoListCache.get(*cache_parts)
+        if cached is not None:
+            return cached["data"], cached["next_cursor"]
+
+        query = db.session.query(Video.id, Video.created_at, Video.views) \
+            .filter(Video.status == VIDEO_READY) \
+            .order_by(Video.created_at.desc(), Video.id.desc())
+
+        if tags:
+            tagged = select(video_tags.c.video_id).where(video_tags.c.tag_id.in_(tags))
+            if match_all and len(set(tags)) > 1:
+                tagged = tagged.group_by(video_tags.c.video_id).having(
+                    func.count(func.distinct(video_tags.c.tag_id)) == len(set(tags))
+                )
+            query = query.filter(Video.id.in_(tagged))
+
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Video.created_at, Video.id) < (created_at, last_id))
+
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        ids = [row.id for row in rows]
+        pending = ViewCounter.pending(ids)
+        videos = VideoService.get_videos_by_ids(
+            ids,
+            views={str(row.id): (row.views or 0) + pending.get(str(row.id), 0) for row in rows},
+        )
+        VideoListCache.set(version, {"data": videos, "next_cursor": next_cursor}, *cache_parts)
+        return videos, next_cursor
+
+    @staticmethod
+    def search(q: str, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE):
+        """
+        Rank videos matching q through the search_vector GIN index and return
+        one page with the cursor of the next page, best matches first.
+        """
+        ts_query = func.websearch_to_tsquery('english', q)
+        rank = func.ts_rank_cd(Video.search_vector, ts_query)
+        query = db.session.query(Video.id, Video.views, rank.label("rank")) \
+            .filter(Video.search_vector.op('@@')(ts_query), Video.status == VIDEO_READY) \
+            .order_by(rank.desc(), Video.id.desc())
+
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, parse=float)
+            # ts_rank_cd returns real; compare as real so ties are not skipped
+            query = query.filter(
+                tuple_(rank, Video.id) < tuple_(cast(last_rank, REAL), literal(last_id, Video.id.type))
+            )
+
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(repr(rows[-1].rank), rows[-1].id)
+
+        ids = [row.id for row in rows]
+        pending = ViewCounter.pending(ids)
+        videos = VideoService.get_videos_by_ids(
+            ids,
+            views={str(row.id): (row.views or 0) + pending.get(str(row.id), 0) for row in rows},
+        )
+        return videos, next_cursor
+
+    @staticmethod
+    def get_video_by_id(id:str):
+        """Count a view in Redis and return the video with DB views plus the pending delta."""
+        row = db.session.query(Video.id, Video.views).filter(Video.id == id).first()
+        if row:
+            views = (row.views or 0) + VideoService.count_view(row.id)
+            videos = VideoService.get_videos_by_ids([row.id], views={str(row.id): views})
+            return videos[0] if videos else None
+
+    @staticmethod
+    def count_revalidated_view(video_id):
+        """
+        Count the view of a watch page answered with 304. The view never ran,
+        so the ID is checked here: junk or deleted IDs count nothing.
+        """
+        if not is_valid_uuid(video_id):
+            return
+        try:
+            known = bool(VideoFragments.get_many([video_id]))
+        except Exception as e:
+            print(f"Error reading video fragment: {e}")
+            known = False
+        if not known and not db.session.query(exists().where(Video.id == video_id)).scalar():
+            return
+        VideoService.count_view(video_id)
+
+    @staticmethod
+    def count_view(video_id) -> int:
+        """Record a view; returns the delta still waiting to be flushed."""
+        pending = ViewCounter.incr(video_id)
+        Trending.bump(video_id, trending.VIEW_WEIGHT)
+        return pending
+
+    @staticmethod
+    def get_trending(limit: int) -> list:
+        """Top videos straight from the trending sorted set."""
+        top = Trending.top(limit)
+        junk = [id for id in top if not is_valid_uuid(id)]
+        if junk:
+            # Not a video; drop it rather than fail every request until a rebuild
+            Trending.remove(*junk)
+        ids = [uuid.UUID(id) for id in top if is_valid_uuid(id)]
+        if not ids:
+            return []
+        rows = db.session.query(Video.id, Video.views).filter(Video.id.in_(ids)).all()
+        # Deleted videos left in the set (or in fragments) by a failed cleanup are skipped
+        found = {row.id for row in rows}
+        ids = [id for id in ids if id in found]
+        pending = ViewCounter.pending(ids)
+        return VideoService.get_videos_by_ids(
+            ids,
+            views={str(row.id): (row.views or 0) + pending.get(str(row.id), 0) for row in rows},
+        )
+
+    @staticmethod
+    def rebuild_trending() -> int:
+        """
+        Regenerate the trending set from Postgres, e.g. after Redis data loss.
+        Historic events carry no timestamps, so each video's totals are decayed
+        from its creation time.
+        """
+        rows = db.session.query(
+            Video.id,
+            Video.created_at,
+            func.coalesce(Video.views, 0),
+            Video.like_count,
+            Video.dislike_count,
+            Video.comment_count,
+        ).filter(Video.status == VIDEO_READY).yield_per(1000)
+
+        now = time.time()
+        scores = {}
+        for id, created_at, views, like_total, dislike_total, comment_total in rows:
+            raw = (views * trending.VIEW_WEIGHT + like_total * trending.LIKE_WEIGHT
+                   + dislike_total * trending.DISLIKE_WEIGHT + comment_total * trending.COMMENT_WEIGHT)
+            created = created_at.replace(tzinfo=timezone.utc).timestamp() if created_at else now
+            scores[str(id)] = raw * trending.decay_factor(created, now)
+
+        Trending.replace(scores, epoch=now)
+        return len(scores)
+
+    @staticmethod
+    def adjust_counters(session, video_id, **deltas):
+        """
+        Add deltas to the denormalized counters of a video, e.g. like_count=1,
+        without committing, so the change shares the caller's transaction.
+        """
+        changes = {name: getattr(Video, name) + delta for name, delta in deltas.items() if delta}
+        if not changes:
+            return
+        session.execute(
+            update(Video)
+            .where(Video.id == video_id)
+            # Keep updated_at: counters are not an edit of the video
+            .values(updated_at=Video.updated_at, **changes)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def flush_views() -> int:
+        """
+        Apply buffered view deltas with one UPDATE ... FROM (VALUES ...).
+        Batches orphaned by a flush that died mid-way are put back first.
+        """
+        ViewCounter.recover()
+        batch, deltas = ViewCounter.take()
+        if batch is None:
+            return 0
+        if not any(is_valid_uuid(id) for id in deltas):
+            ViewCounter.ack(batch)
+            return 0
+        pending = values(
+            column("id", UUID(as_uuid=True)),
+            column("delta", Integer),
+            name="pending",
+        ).data([(uuid.UUID(id), delta) for id, delta in deltas.items() if is_valid_uuid(id)])
+        try:
+            db.session.execute(
+                update(Video)
+                .where(Video.id == pending.c.id)
+                # Keep updated_at: a view is not an edit of the video
+                .values(views=func.coalesce(Video.views, 0) + pending.c.delta,
+                        updated_at=Video.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            ViewCounter.restore(batch)
+            raise
+        ViewCounter.ack(batch)
+        return len(deltas)
+
     @staticmethod  
     def video_exists(id: str) -> bool:
         """Checks if a video with the given ID already exists in the database."""
@@ -161,8 +665,23 @@ class VideoService:
     def delete_content(content_id):
         content = Video.query.get(content_id)
         if content:
-            Storage.delete_file(content.src['fileId'])
-            Storage.delete_file(content.thumbnail["fileId"])
-
+            # Videos still processing have no stored files yet; files shared
+            # with other uploads stay stored, the rest are deleted by the
+            # storage worker once this commits
+            MediaBlobs.release(media_file_ids(content.src) + media_file_ids(content.thumbnail))
             db.session.delete(content)
-            db.session.commit()
\ No newline at end of file
+            db.session.commit()
+            VideoService.videos_deleted([content_id])
+
+    @staticmethod
+    def videos_deleted(video_ids):
+        """Drop the cached data of deleted videos once the delete is committed."""
+        video_ids = [str(id) for id in video_ids]
+        if not video_ids:
+            return
+        VideoFragments.delete(*video_ids)
+        Trending.remove(*video_ids)
+        for video_id in video_ids:
+            CommentWindow.drop(video_id)
+        purge_surrogate_keys(*[f"comments-{id}" for id in video_ids])
+        VideoService.videos_changed(video_ids, refresh=False)
\ No newline at end of file
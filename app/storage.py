@@ -1,7 +0,0 @@
-from imagekitio import ImageKit
-
-Storage = ImageKit(
-	private_key='private_etXNDj6Pmh6guQTmNkgufEAM0eI=',
-	public_key='public_ufUrqFf53tvGrQLnmlKrf3Ei5VI=',
-	url_endpoint='https://ik.imagekit.io/lhvoxkb7i',
-)
\ No newline at end of file
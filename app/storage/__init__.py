@@ -0,0 +1,45 @@
+from flask import current_app
+from .base import StorageBackend
+from .imagekit import ImageKitStorage
+from .local import LocalStorage
+
+
+def create_backend(config) -> StorageBackend:
+    """Build the backend named by STORAGE_BACKEND."""
+    backend = config["STORAGE_BACKEND"]
+    if backend == "imagekit":
+        missing = [
+            name for name in ("IMAGEKIT_PRIVATE_KEY", "IMAGEKIT_PUBLIC_KEY", "IMAGEKIT_URL_ENDPOINT")
+            if not config.get(name)
+        ]
+        if missing:
+            raise ValueError(f"STORAGE_BACKEND 'imagekit' requires {', '.join(missing)}")
+        return ImageKitStorage(
+            private_key=config["IMAGEKIT_PRIVATE_KEY"],
+            public_key=config["IMAGEKIT_PUBLIC_KEY"],
+            url_endpoint=config["IMAGEKIT_URL_ENDPOINT"],
+            buffer_size=config["UPLOAD_BUFFER_SIZE"],
+        )
+    if backend == "local":
+        return LocalStorage(
+            root=config["LOCAL_STORAGE_ROOT"],
+            base_url=config["LOCAL_STORAGE_URL"],
+            buffer_size=config["UPLOAD_BUFFER_SIZE"],
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}")
+
+
+class StorageProxy:
+    """
+    The storage backend of the current app. Replace
+    app.extensions["storage"] to swap it, e.g. for a stub in tests.
+    """
+
+    def init_app(self, app):
+        app.extensions["storage"] = create_backend(app.config)
+
+    def __getattr__(self, name):
+        return getattr(current_app.extensions["storage"], name)
+
+
+Storage = StorageProxy()
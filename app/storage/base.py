@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from io import BytesIO
+from ..types import UploadResult
+
+
+class StorageBackend(ABC):
+    """
+    Where uploaded media lives. Files are addressed by the file_id returned
+    from an upload; the url in the result is what clients are given.
+    """
+
+    @abstractmethod
+    def upload_stream(self, file, file_name: str, folder: str,
+                      content_type: str = "application/octet-stream", on_progress=None) -> UploadResult:
+        """
+        Store an open binary file, reading it in bounded chunks.
+        on_progress(sent, total) is called as the transfer advances.
+        """
+
+    def upload(self, data: bytes, file_name: str, folder: str,
+               content_type: str = "application/octet-stream") -> UploadResult:
+        """Store an in-memory file."""
+        return self.upload_stream(BytesIO(data), file_name, folder, content_type)
+
+    @abstractmethod
+    def delete(self, file_id: str):
+        """Remove one file; raises if the backend refuses."""
+
+    def bulk_delete(self, file_ids: list) -> list:
+        """Remove many files; returns the IDs that could not be removed."""
+        failed = []
+        for file_id in file_ids:
+            try:
+                self.delete(file_id)
+            except Exception as e:
+                print(f"Error deleting file {file_id}: {e}")
+                failed.append(file_id)
+        return failed
+
+    @abstractmethod
+    def exists(self, file_id: str) -> bool:
+        """Whether file_id is still stored."""
+
+    @abstractmethod
+    def url(self, path: str, transformation: list = None) -> str:
+        """Public URL of a stored path, optionally transformed where supported."""
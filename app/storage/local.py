@@ -0,0 +1,66 @@
+import os
+import tempfile
+from werkzeug.security import safe_join
+from .base import StorageBackend
+from ..types import UploadResult
+
+
+class LocalStorage(StorageBackend):
+    """
+    Media on the local filesystem under root, served by the media route at
+    base_url. The file_id is the path relative to root.
+    """
+
+    def __init__(self, root: str, base_url: str, buffer_size: int):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.buffer_size = buffer_size
+
+    def path(self, file_id: str) -> str:
+        path = safe_join(self.root, file_id)
+        if path is None:
+            raise ValueError(f"Invalid file ID {file_id}")
+        return path
+
+    def upload_stream(self, file, file_name, folder, content_type="application/octet-stream",
+                      on_progress=None):
+        file_id = f"{folder.strip('/')}/{file_name}"
+        path = self.path(file_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        start = file.tell()
+        file.seek(0, os.SEEK_END)
+        total = file.tell() - start
+        file.seek(start)
+
+        # Write next to the target and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            sent = 0
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = file.read(self.buffer_size)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    sent += len(chunk)
+                    if on_progress:
+                        on_progress(sent, total)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return UploadResult(
+            file_id=file_id,
+            url=self.url(file_id),
+            raw={"fileId": file_id, "filePath": f"/{file_id}", "size": sent, "fileType": content_type},
+        )
+
+    def delete(self, file_id):
+        os.remove(self.path(file_id))
+
+    def exists(self, file_id):
+        return os.path.isfile(self.path(file_id))
+
+    def url(self, path, transformation=None):
+        return f"{self.base_url}/{path.lstrip('/')}"
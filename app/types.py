@@ -4,4 +4,18 @@ from dataclasses import dataclass
 class FileType():
 	fileId:str
 	url:str
-	is_default: bool
\ No newline at end of file
+	is_default: bool
+
+@dataclass
+class UploadResult():
+	file_id:str
+	url:str
+	raw:dict
+
+
+@dataclass
+class MediaInfo():
+	container:str
+	duration:float
+	width:int
+	height:int
@@ -1,3 +1,5 @@
 from .serialize_data import serialize_data
 from .is_uuid import is_valid_uuid
-from .mail_template import template_mail
\ No newline at end of file
+from .mail_template import template_mail
+from .cursor import encode_cursor, decode_cursor, clamp_page_size
+from .media import media_file_ids, file_sha256, save_sha256
@@ -0,0 +1,30 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
+from ..constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+def encode_cursor(position, id) -> str:
+    """Encode the keyset position of the last row of a page into an opaque token."""
+    if isinstance(position, datetime):
+        position = position.isoformat()
+    raw = f"{position}|{id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('utf-8').rstrip('=')
+
+
+def decode_cursor(cursor: str, parse=datetime.fromisoformat) -> tuple:
+    """Decode a token produced by encode_cursor back into (position, UUID)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position, id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        return parse(position), uuid.UUID(id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def clamp_page_size(limit) -> int:
+    """Bound a client supplied page size to [1, MAX_PAGE_SIZE]."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
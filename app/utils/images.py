@@ -0,0 +1,25 @@
+from io import BytesIO
+from PIL import Image, ImageOps
+
+
+def webp_variants(data: bytes, widths: tuple, quality: int = 80) -> dict:
+    """
+    Resize an image to each of widths, never upscaling, and encode it as
+    WebP. Returns {width: (webp_bytes, height)}. CPU-bound; runs in a
+    worker process.
+    """
+    with Image.open(BytesIO(data)) as image:
+        # Let JPEG decode at a reduced scale when the largest variant allows it
+        image.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode in ("LA", "P", "PA") else "RGB")
+
+        variants = {}
+        for width in sorted({min(width, image.width) for width in widths}):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, "WEBP", quality=quality, method=4)
+            variants[width] = (buffer.getvalue(), height)
+        return variants
@@ -0,0 +1,28 @@
+import hashlib
+
+
+def media_file_ids(info: dict) -> list:
+    """Storage file IDs of a stored image or video JSON, including its resized variants."""
+    if not info or not info.get("fileId") or info.get("is_default"):
+        return []
+    return [info["fileId"]] + [variant["fileId"] for variant in (info.get("sizes") or {}).values()]
+
+
+def file_sha256(file, buffer_size: int = 64 * 1024) -> str:
+    """Hex SHA-256 of an open binary file, read in bounded chunks from its current position, which is restored."""
+    digest = hashlib.sha256()
+    start = file.tell()
+    for chunk in iter(lambda: file.read(buffer_size), b""):
+        digest.update(chunk)
+    file.seek(start)
+    return digest.hexdigest()
+
+
+def save_sha256(file, path: str, buffer_size: int = 64 * 1024) -> str:
+    """Copy an open binary file to path in bounded chunks and return its hex SHA-256 from the same pass."""
+    digest = hashlib.sha256()
+    with open(path, "wb") as target:
+        for chunk in iter(lambda: file.read(buffer_size), b""):
+            digest.update(chunk)
+            target.write(chunk)
+    return digest.hexdigest()
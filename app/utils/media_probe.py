@@ -0,0 +1,289 @@
+"""
+Read the duration and frame size of MP4/MOV and WebM/Matroska files from
+their headers alone. Boxes and elements that are not needed (mdat, sample
+tables, clusters) are skipped with seek, so only a few KB are read
+whatever the file size.
+"""
+import os
+import struct
+from ..types import MediaInfo
+
+# Largest header payload read into memory (mvhd, tkhd, hdlr, Info, Tracks)
+MAX_HEADER_READ = 1024 ** 2
+
+MP4_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot", b"uuid"}
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+# Matroska element IDs, marker bits included
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+CLUSTER = 0x1F43B675
+
+
+class ProbeError(ValueError):
+    pass
+
+
+def probe_video(file) -> MediaInfo:
+    """
+    Probe an open binary file from its current position, which is restored
+    afterwards. Raises ProbeError for unknown containers, truncated headers
+    and files without a video track.
+    """
+    start = file.tell()
+    file.seek(0, os.SEEK_END)
+    end = file.tell()
+    file.seek(start)
+    try:
+        head = file.read(8)
+        if head[:4] == EBML_MAGIC:
+            return _probe_ebml(file, start, end)
+        if len(head) == 8 and head[4:8] in MP4_TOP_LEVEL:
+            return _probe_mp4(file, start, end)
+        raise ProbeError("Unrecognized video container")
+    except struct.error:
+        raise ProbeError("Video header is truncated")
+    finally:
+        file.seek(start)
+
+
+def _read(file, size: int) -> bytes:
+    if size > MAX_HEADER_READ:
+        raise ProbeError("Video header is too large")
+    data = file.read(size)
+    if len(data) != size:
+        raise ProbeError("Video header is truncated")
+    return data
+
+
+# MP4 / QuickTime
+
+def _boxes(file, start: int, end: int):
+    """Yield (type, payload_start, box_end) of the boxes between start and end."""
+    position = start
+    while position + 8 <= end:
+        file.seek(position)
+        size, box_type = struct.unpack(">I4s", _read(file, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", _read(file, 8))[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header or position + size > end:
+            raise ProbeError("Video header is truncated")
+        yield box_type, position + header, position + size
+        position += size
+
+
+def _child(file, start: int, end: int, box_type: bytes):
+    for child_type, payload, child_end in _boxes(file, start, end):
+        if child_type == box_type:
+            return payload, child_end
+    return None
+
+
+def _probe_mp4(file, start: int, end: int) -> MediaInfo:
+    moov = _child(file, start, end, b"moov")
+    if moov is None:
+        raise ProbeError("Video has no moov header")
+
+    duration = None
+    width = height = None
+    for box_type, payload, box_end in _boxes(file, *moov):
+        if box_type == b"mvhd":
+            file.seek(payload)
+            version = _read(file, 1)[0]
+            if version == 1:
+                timescale, length = struct.unpack(">19xIQ", _read(file, 31))
+            else:
+                timescale, length = struct.unpack(">11xII", _read(file, 19))
+            # Fragmented files leave the mvhd duration at 0: unknown, not empty
+            duration = length / timescale if timescale and length else None
+        elif box_type == b"trak" and width is None:
+            size = _video_track_size(file, payload, box_end)
+            if size:
+                width, height = size
+
+    if width is None:
+        raise ProbeError("Video has no video track")
+    return MediaInfo(container="mp4", duration=duration, width=width, height=height)
+
+
+def _video_track_size(file, start: int, end: int):
+    """(width, height) of a video trak, rotation applied; None for other tracks."""
+    mdia = _child(file, start, end, b"mdia")
+    hdlr = mdia and _child(file, *mdia, b"hdlr")
+    if not hdlr:
+        return None
+    file.seek(hdlr[0] + 8)
+    if _read(file, 4) != b"vide":
+        return None
+
+    tkhd = _child(file, start, end, b"tkhd")
+    if tkhd is None:
+        raise ProbeError("Video track has no tkhd header")
+    file.seek(tkhd[0])
+    version = _read(file, 1)[0]
+    # Skip flags, times, track ID and duration up to the matrix
+    file.seek(tkhd[0] + (52 if version == 1 else 40))
+    matrix = struct.unpack(">9i", _read(file, 36))
+    width, height = (value >> 16 for value in struct.unpack(">II", _read(file, 8)))
+    # Rotated by 90 or 270 degrees: a == 0 and b == +-1.0 in 16.16
+    if matrix[0] == 0 and abs(matrix[1]) == 0x10000:
+        width, height = height, width
+    return width, height
+
+
+# WebM / Matroska
+
+def _vint(file, keep_marker: bool):
+    first = _read(file, 1)[0]
+    if first == 0:
+        raise ProbeError("Invalid EBML variable-length integer")
+    length = 8 - first.bit_length() + 1
+    value = first if keep_marker else first & (0xFF >> length)
+    for byte in _read(file, length - 1):
+        value = (value << 8) | byte
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, unknown
+
+
+def _elements(file, start: int, end: int):
+    """Yield (id, payload_start, element_end) of the elements between start and end."""
+    position = start
+    while position < end:
+        file.seek(position)
+        element_id, _ = _vint(file, keep_marker=True)
+        size, unknown = _vint(file, keep_marker=False)
+        payload = file.tell()
+        element_end = end if unknown else payload + size
+        if element_end > end:
+            raise ProbeError("Video header is truncated")
+        yield element_id, payload, element_end
+        if unknown:
+            return
+        position = element_end
+
+
+def _uint(data: bytes) -> int:
+    return int.from_bytes(data, "big")
+
+
+def _probe_ebml(file, start: int, end: int) -> MediaInfo:
+    header = next(_elements(file, start, end), None)
+    if header is None:
+        raise ProbeError("Video header is truncated")
+    _, payload, header_end = header
+    doc_type = None
+    for child_id, child, child_end in _elements(file, payload, header_end):
+        if child_id == EBML_DOCTYPE:
+            file.seek(child)
+            doc_type = _read(file, child_end - child).rstrip(b"\x00").decode("ascii", "replace")
+    if doc_type not in ("webm", "matroska"):
+        raise ProbeError(f"Unsupported EBML document type {doc_type}")
+
+    segment = next((item for item in _elements(file, header_end, end) if item[0] == SEGMENT), None)
+    if segment is None:
+        raise ProbeError("Video has no Segment")
+    _, segment_start, segment_end = segment
+
+    found = {}
+    seek_positions = {}
+    for element_id, payload, element_end in _elements(file, segment_start, segment_end):
+        if element_id in (INFO, TRACKS):
+            found[element_id] = (payload, element_end)
+        elif element_id == SEEK_HEAD:
+            seek_positions = _seek_head(file, payload, element_end, segment_start)
+        elif element_id == CLUSTER:
+            break
+        if INFO in found and TRACKS in found:
+            break
+
+    # Info or Tracks written after the clusters are reached through the SeekHead
+    for element_id in (INFO, TRACKS):
+        if element_id not in found and element_id in seek_positions:
+            # A position at or past the segment end yields no element
+            target = next(_elements(file, seek_positions[element_id], segment_end), None)
+            if target is not None and target[0] == element_id:
+                found[element_id] = target[1:]
+    if INFO not in found or TRACKS not in found:
+        raise ProbeError("Video header has no Info or Tracks")
+
+    timecode_scale, duration = 1_000_000, None
+    for element_id, payload, element_end in _elements(file, *found[INFO]):
+        file.seek(payload)
+        data = _read(file, element_end - payload)
+        if element_id == TIMECODE_SCALE:
+            timecode_scale = _uint(data)
+        elif element_id == DURATION:
+            duration = struct.unpack(">f" if len(data) == 4 else ">d", data)[0]
+
+    size = _ebml_video_size(file, *found[TRACKS])
+    if size is None:
+        raise ProbeError("Video has no video track")
+    return MediaInfo(
+        container="webm" if doc_type == "webm" else "matroska",
+        duration=duration * timecode_scale / 1e9 if duration else None,
+        width=size[0],
+        height=size[1],
+    )
+
+
+def _seek_head(file, start: int, end: int, segment_start: int) -> dict:
+    positions = {}
+    for element_id, payload, element_end in _elements(file, start, end):
+        if element_id != SEEK:
+            continue
+        target = position = None
+        for child_id, child, child_end in _elements(file, payload, element_end):
+            file.seek(child)
+            data = _read(file, child_end - child)
+            if child_id == SEEK_ID:
+                target = _uint(data)
+            elif child_id == SEEK_POSITION:
+                position = _uint(data)
+        if target is not None and position is not None:
+            positions[target] = segment_start + position
+    return positions
+
+
+def _ebml_video_size(file, start: int, end: int):
+    for element_id, payload, element_end in _elements(file, start, end):
+        if element_id != TRACK_ENTRY:
+            continue
+        track_type = None
+        video = None
+        for child_id, child, child_end in _elements(file, payload, element_end):
+            if child_id == TRACK_TYPE:
+                file.seek(child)
+                track_type = _uint(_read(file, child_end - child))
+            elif child_id == VIDEO:
+                video = (child, child_end)
+        if track_type != 1 or video is None:
+            continue
+        width = height = None
+        for child_id, child, child_end in _elements(file, *video):
+            if child_id in (PIXEL_WIDTH, PIXEL_HEIGHT):
+                file.seek(child)
+                value = _uint(_read(file, child_end - child))
+                if child_id == PIXEL_WIDTH:
+                    width = value
+                else:
+                    height = value
+        if width and height:
+            return width, height
+    return None
@@ -0,0 +1,58 @@
+import os
+import uuid
+from io import BytesIO
+
+
+class MultipartStream:
+    """
+    multipart/form-data body around an open file. Reads return at most
+    buffer_size bytes straight from the file, so the upload is never held in
+    memory. The body has a length, so HTTP clients send it with
+    Content-Length rather than chunked encoding. on_progress(sent, total)
+    is called after every chunk.
+    """
+
+    def __init__(self, fields: dict, name: str, file, filename: str,
+                 content_type: str = "application/octet-stream", buffer_size: int = 64 * 1024,
+                 on_progress=None):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self.buffer_size = buffer_size
+        self.bytes_read = 0
+        self.on_progress = on_progress
+
+        head = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+            for key, value in fields.items()
+        ) + (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+
+        start = file.tell()
+        file.seek(0, os.SEEK_END)
+        self.file_size = file.tell() - start
+        file.seek(start)
+
+        self._length = len(head) + self.file_size + len(tail)
+        self._parts = [BytesIO(head), file, BytesIO(tail)]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.buffer_size:
+            size = self.buffer_size
+        while self._parts:
+            chunk = self._parts[0].read(size)
+            if chunk:
+                self.bytes_read += len(chunk)
+                if self.on_progress:
+                    self.on_progress(self.bytes_read, self._length)
+                return chunk
+            self._parts.pop(0)
+        return b""
+
+    def __iter__(self):
+        return iter(lambda: self.read(self.buffer_size), b"")
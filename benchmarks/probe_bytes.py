@@ -0,0 +1,101 @@
+"""
+Bytes read by the video header prober against the size of the file. The
+sample files carry a large sparse media payload (mdat / Cluster) that the
+prober must skip; the MP4 has its moov after the payload, as written by
+most cameras.
+
+    python benchmarks/probe_bytes.py --payload-mb 2048
+"""
+import argparse
+import io
+import os
+import struct
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.media_probe import probe_video  # noqa: E402
+
+
+class CountingReader(io.RawIOBase):
+    """Wraps a file and counts the bytes actually read from it."""
+
+    def __init__(self, file):
+        self.file = file
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self.file.seek(offset, whence)
+
+    def tell(self):
+        return self.file.tell()
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def write_mp4(file, payload_size: int):
+    file.write(box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2avc1mp41"))
+    # mdat header only; the payload is a hole in a sparse file
+    file.write(struct.pack(">I4sQ", 1, b"mdat", 16 + payload_size))
+    file.seek(payload_size, os.SEEK_CUR)
+    identity = struct.pack(">9i", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    mvhd = box(b"mvhd", struct.pack(">B3xIIII", 0, 0, 0, 1000, 95_500) + bytes(80))
+    tkhd = box(b"tkhd", struct.pack(">B3xIIIII", 0, 0, 0, 1, 0, 95_500) + bytes(16) + identity
+               + struct.pack(">II", 1920 << 16, 1080 << 16))
+    hdlr = box(b"hdlr", bytes(8) + b"vide" + bytes(12) + b"VideoHandler\x00")
+    stbl = box(b"minf", box(b"stbl", bytes(512 * 1024)))
+    file.write(box(b"moov", mvhd + box(b"trak", tkhd + box(b"mdia", hdlr + stbl))))
+
+
+def ebml(element_id: int, payload: bytes) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_bytes + (len(payload) | (1 << 56)).to_bytes(8, "big") + payload
+
+
+def write_webm(file, payload_size: int):
+    file.write(ebml(0x1A45DFA3, ebml(0x4282, b"webm")))
+    info = ebml(0x1549A966, ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big")) + ebml(0x4489, struct.pack(">d", 95_500.0)))
+    video = ebml(0xE0, ebml(0xB0, (1280).to_bytes(2, "big")) + ebml(0xBA, (720).to_bytes(2, "big")))
+    tracks = ebml(0x1654AE6B, ebml(0xAE, ebml(0x83, b"\x01") + video))
+    cluster_header = (0x1F43B675).to_bytes(4, "big") + (payload_size | (1 << 56)).to_bytes(8, "big")
+    # Segment of unknown size, as written by live encoders
+    file.write((0x18538067).to_bytes(4, "big") + b"\x01\xff\xff\xff\xff\xff\xff\xff")
+    file.write(info + tracks + cluster_header)
+    file.seek(payload_size, os.SEEK_CUR)
+    file.truncate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payload-mb", type=int, default=2048)
+    args = parser.parse_args()
+    payload_size = args.payload_mb * 1024 ** 2
+
+    for name, write in (("mp4", write_mp4), ("webm", write_webm)):
+        with tempfile.TemporaryFile() as file:
+            write(file, payload_size)
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            file.seek(0)
+            reader = CountingReader(file)
+            info = probe_video(reader)
+            print(f"{name:<5} {size / 1024 ** 2:10.1f} MiB file, {reader.bytes_read:6d} bytes read -> "
+                  f"{info.width}x{info.height}, {info.duration:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
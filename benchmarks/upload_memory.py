@@ -0,0 +1,68 @@
+"""
+Peak Python heap of one upload: the old whole-file base64 path against the
+streaming multipart body.
+
+    python benchmarks/upload_memory.py --size-mb 256 --buffer-kb 64
+"""
+import argparse
+import base64
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.multipart import MultipartStream  # noqa: E402
+
+
+def make_file(size: int):
+    file = tempfile.TemporaryFile()
+    block = os.urandom(1024 ** 2)
+    for _ in range(size // len(block)):
+        file.write(block)
+    file.write(block[:size % len(block)])
+    file.seek(0)
+    return file
+
+
+def measure(label: str, run):
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} peak {peak / 1024 ** 2:10.2f} MiB")
+    return peak
+
+
+def base64_upload(file):
+    file.seek(0)
+    base64.b64encode(file.read())
+
+
+def streaming_upload(file, buffer_size: int):
+    file.seek(0)
+    body = MultipartStream({"fileName": "bench.mp4", "folder": "bench"}, "file", file,
+                           "bench.mp4", buffer_size=buffer_size)
+    # Same access pattern as the HTTP client: fixed-size reads until EOF
+    sent = 0
+    for chunk in body:
+        sent += len(chunk)
+    assert sent == len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--buffer-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    with make_file(args.size_mb * 1024 ** 2) as file:
+        print(f"file {args.size_mb} MiB, buffer {args.buffer_kb} KiB")
+        legacy = measure("base64", lambda: base64_upload(file))
+        streaming = measure("streaming", lambda: streaming_upload(file, args.buffer_kb * 1024))
+        print(f"streaming uses {legacy / streaming:.0f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
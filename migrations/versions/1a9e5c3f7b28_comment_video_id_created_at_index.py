@@ -0,0 +1,24 @@
+"""comment(video_id, created_at) index for paginated comments
+
+Revision ID: 1a9e5c3f7b28
+Revises: f8c2a4b61d09
+Create Date: 2026-10-18 13:34:50.218764
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a9e5c3f7b28'
+down_revision = 'f8c2a4b61d09'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_comment_video_id_created_at', 'comment', ['video_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_comment_video_id_created_at', table_name='comment')
@@ -0,0 +1,33 @@
+"""media_blob for content-addressed upload deduplication
+
+Revision ID: 2f7b9c4e6a13
+Revises: 5e8a1d3c9b74
+Create Date: 2026-10-18 17:41:05.562930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f7b9c4e6a13'
+down_revision = '5e8a1d3c9b74'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Files stored before this revision are not tracked and are deleted as before
+    op.create_table('media_blob',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('file_id', sa.String(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('refcount', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('hash'),
+    sa.UniqueConstraint('file_id')
+    )
+
+
+def downgrade():
+    op.drop_table('media_blob')
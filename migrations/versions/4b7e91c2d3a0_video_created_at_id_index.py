@@ -0,0 +1,24 @@
+"""video created_at/id index for keyset pagination
+
+Revision ID: 4b7e91c2d3a0
+Revises: a13e2b48c3bf
+Create Date: 2026-10-18 09:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e91c2d3a0'
+down_revision = 'a13e2b48c3bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_video_created_at_id', 'video', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_video_created_at_id', table_name='video')
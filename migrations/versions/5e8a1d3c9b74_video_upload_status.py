@@ -0,0 +1,25 @@
+"""video upload status
+
+Revision ID: 5e8a1d3c9b74
+Revises: 7c4d0b8e2f16
+Create Date: 2026-10-18 15:02:47.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a1d3c9b74'
+down_revision = '7c4d0b8e2f16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing videos were uploaded synchronously and are ready
+    op.add_column('video', sa.Column('status', sa.String(length=16), server_default='ready', nullable=False))
+
+
+def downgrade():
+    op.drop_column('video', 'status')
@@ -0,0 +1,58 @@
+"""keep video reaction counters in a trigger on video_reaction
+
+Revision ID: 6d1f3a9c5e27
+Revises: 8b3e5f1a7d42
+Create Date: 2026-10-18 21:03:44.270158
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d1f3a9c5e27'
+down_revision = '8b3e5f1a7d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per changed row, so concurrent toggles and FK cascades (e.g. deleting a
+    # user) keep the counters equal to the rows
+    op.execute("""
+        CREATE FUNCTION video_reaction_counts() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE video SET
+                    like_count = like_count - (OLD.value = 1)::int,
+                    dislike_count = dislike_count - (OLD.value = -1)::int
+                WHERE id = OLD.video_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE video SET
+                    like_count = like_count + (NEW.value = 1)::int,
+                    dislike_count = dislike_count + (NEW.value = -1)::int
+                WHERE id = NEW.video_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER video_reaction_counts
+        AFTER INSERT OR UPDATE OR DELETE ON video_reaction
+        FOR EACH ROW EXECUTE FUNCTION video_reaction_counts()
+    """)
+    # Repair counters that drifted under the previous toggle statement
+    op.execute("""
+        UPDATE video SET
+            like_count = (SELECT count(*) FROM video_reaction
+                          WHERE video_id = video.id AND value = 1),
+            dislike_count = (SELECT count(*) FROM video_reaction
+                             WHERE video_id = video.id AND value = -1)
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER video_reaction_counts ON video_reaction")
+    op.execute("DROP FUNCTION video_reaction_counts()")
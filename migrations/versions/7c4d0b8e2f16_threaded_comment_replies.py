@@ -0,0 +1,55 @@
+"""threaded comment replies: parent_id, path, depth, reply_count
+
+Revision ID: 7c4d0b8e2f16
+Revises: 1a9e5c3f7b28
+Create Date: 2026-10-18 14:10:26.650391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4d0b8e2f16'
+down_revision = '1a9e5c3f7b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('comment', sa.Column('parent_id', sa.UUID(), nullable=True))
+    op.add_column('comment', sa.Column('path', sa.String(), nullable=True))
+    op.add_column('comment', sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('comment', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Every existing comment is top-level: its path is its own hex ID
+    op.execute("UPDATE comment SET path = replace(id::text, '-', '')")
+    op.alter_column('comment', 'path', nullable=False)
+
+    op.create_foreign_key(
+        'comment_parent_id_fkey', 'comment', 'comment', ['parent_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index('ix_comment_parent_id', 'comment', ['parent_id'], unique=False)
+    op.create_index(
+        'ix_comment_path', 'comment', ['path'], unique=False,
+        postgresql_ops={'path': 'varchar_pattern_ops'},
+    )
+
+    # Deleting a video removes its comment threads in the database
+    op.drop_constraint('comment_video_id_fkey', 'comment', type_='foreignkey')
+    op.create_foreign_key(
+        'comment_video_id_fkey', 'comment', 'video', ['video_id'], ['id'], ondelete='CASCADE'
+    )
+
+
+def downgrade():
+    op.drop_constraint('comment_video_id_fkey', 'comment', type_='foreignkey')
+    op.create_foreign_key('comment_video_id_fkey', 'comment', 'video', ['video_id'], ['id'])
+
+    op.drop_index('ix_comment_path', table_name='comment')
+    op.drop_index('ix_comment_parent_id', table_name='comment')
+    op.drop_constraint('comment_parent_id_fkey', 'comment', type_='foreignkey')
+    op.drop_column('comment', 'reply_count')
+    op.drop_column('comment', 'depth')
+    op.drop_column('comment', 'path')
+    op.drop_column('comment', 'parent_id')
@@ -0,0 +1,34 @@
+"""storage_outbox for deferred storage deletions
+
+Revision ID: 8b3e5f1a7d42
+Revises: 2f7b9c4e6a13
+Create Date: 2026-10-18 19:12:36.804517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3e5f1a7d42'
+down_revision = '2f7b9c4e6a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('storage_outbox',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('file_id', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_storage_outbox_next_attempt_at', 'storage_outbox', ['next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_storage_outbox_next_attempt_at', table_name='storage_outbox')
+    op.drop_table('storage_outbox')
@@ -0,0 +1,24 @@
+"""video_tags(tag_id, video_id) index for tag filtered listings
+
+Revision ID: 9d2f6e0a1c57
+Revises: 4b7e91c2d3a0
+Create Date: 2026-10-18 10:02:13.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2f6e0a1c57'
+down_revision = '4b7e91c2d3a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_video_tags_tag_id_video_id', 'video_tags', ['tag_id', 'video_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_video_tags_tag_id_video_id', table_name='video_tags')
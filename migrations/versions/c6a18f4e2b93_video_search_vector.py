@@ -0,0 +1,36 @@
+"""weighted tsvector over video title/description with GIN index
+
+Revision ID: c6a18f4e2b93
+Revises: 9d2f6e0a1c57
+Create Date: 2026-10-18 10:41:55.067920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6a18f4e2b93'
+down_revision = '9d2f6e0a1c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('video', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_video_search_vector', 'video', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_video_search_vector', table_name='video', postgresql_using='gin')
+    op.drop_column('video', 'search_vector')
@@ -0,0 +1,34 @@
+"""denormalized like/dislike/comment counters on video
+
+Revision ID: e3b5d7a90f21
+Revises: c6a18f4e2b93
+Create Date: 2026-10-18 11:20:37.940112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b5d7a90f21'
+down_revision = 'c6a18f4e2b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('video', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('video', sa.Column('dislike_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('video', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE video SET
+            like_count = (SELECT count(*) FROM user_liked_videos WHERE video_id = video.id),
+            dislike_count = (SELECT count(*) FROM user_disliked_videos WHERE video_id = video.id),
+            comment_count = (SELECT count(*) FROM comment WHERE video_id = video.id)
+    """)
+
+
+def downgrade():
+    op.drop_column('video', 'comment_count')
+    op.drop_column('video', 'dislike_count')
+    op.drop_column('video', 'like_count')
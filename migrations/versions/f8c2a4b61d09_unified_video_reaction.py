@@ -0,0 +1,77 @@
+"""replace user_liked_videos/user_disliked_videos with video_reaction
+
+Revision ID: f8c2a4b61d09
+Revises: e3b5d7a90f21
+Create Date: 2026-10-18 12:05:09.331874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8c2a4b61d09'
+down_revision = 'e3b5d7a90f21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('video_reaction',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('video_id', sa.UUID(), nullable=False),
+    sa.Column('value', sa.SmallInteger(), nullable=False),
+    sa.CheckConstraint('value IN (-1, 1)', name='ck_video_reaction_value'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['video_id'], ['video.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'video_id')
+    )
+    op.create_index('ix_video_reaction_video_id', 'video_reaction', ['video_id'], unique=False)
+
+    # A pair present in both old tables keeps the like
+    op.execute("""
+        INSERT INTO video_reaction (user_id, video_id, value)
+        SELECT user_id, video_id, 1 FROM user_liked_videos
+    """)
+    op.execute("""
+        INSERT INTO video_reaction (user_id, video_id, value)
+        SELECT user_id, video_id, -1 FROM user_disliked_videos
+        ON CONFLICT (user_id, video_id) DO NOTHING
+    """)
+    op.execute("""
+        UPDATE video SET
+            like_count = (SELECT count(*) FROM video_reaction
+                          WHERE video_id = video.id AND value = 1),
+            dislike_count = (SELECT count(*) FROM video_reaction
+                             WHERE video_id = video.id AND value = -1)
+    """)
+
+    op.drop_table('user_disliked_videos')
+    op.drop_table('user_liked_videos')
+
+
+def downgrade():
+    op.create_table('user_liked_videos',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('video_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['video_id'], ['video.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'video_id')
+    )
+    op.create_table('user_disliked_videos',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('video_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['video_id'], ['video.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'video_id')
+    )
+    op.execute("""
+        INSERT INTO user_liked_videos (user_id, video_id)
+        SELECT user_id, video_id FROM video_reaction WHERE value = 1
+    """)
+    op.execute("""
+        INSERT INTO user_disliked_videos (user_id, video_id)
+        SELECT user_id, video_id FROM video_reaction WHERE value = -1
+    """)
+    op.drop_index('ix_video_reaction_video_id', table_name='video_reaction')
+    op.drop_table('video_reaction')